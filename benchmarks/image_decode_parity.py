@@ -0,0 +1,74 @@
+"""Parity and speed check: fast image loader vs the generic image processor.
+
+Usage:
+    python -m benchmarks.image_decode_parity DIR [--score-tol 0.02]
+
+For every image in DIR both decode paths feed the same model. The check
+fails (exit 1) if any top-1 label differs or a top-1 score moves by more
+than --score-tol. Decode time per image is reported for both paths.
+"""
+import argparse
+import json
+import sys
+import time
+
+from models.image_classifier import ImageClassifier, list_images
+from models.image_pipeline import StagedImagePipeline
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("directory")
+    ap.add_argument("--score-tol", type=float, default=0.02)
+    ap.add_argument("--limit", type=int, default=64)
+    args = ap.parse_args(argv)
+
+    paths = list_images(args.directory, recursive=False)[:args.limit]
+    if not paths:
+        ap.error(f"no images in {args.directory}")
+
+    import torch
+
+    pipe = ImageClassifier().load()
+    slow = StagedImagePipeline(pipe, fast_decode=False)
+    fast = StagedImagePipeline(pipe, fast_decode=True)
+    if fast._loader is None:
+        print("fast loader does not support this model's image processor; nothing to compare")
+        return 0
+
+    t0 = time.perf_counter()
+    ref_pixels = torch.cat([slow._prepare(p) for p in paths])
+    slow_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fast_pixels = torch.from_numpy(fast._loader.load_batch(paths))
+    fast_s = time.perf_counter() - t0
+
+    ref = slow._postprocess(pipe.forward({"pixel_values": ref_pixels})["logits"])
+    new = fast._postprocess(pipe.forward({"pixel_values": fast_pixels})["logits"])
+
+    mismatches = []
+    max_diff = 0.0
+    for path, r, n in zip(paths, ref, new):
+        diff = abs(r[0]["score"] - n[0]["score"])
+        max_diff = max(max_diff, diff)
+        if r[0]["label"] != n[0]["label"] or diff > args.score_tol:
+            mismatches.append({"path": path, "reference": r[0], "fast": n[0]})
+
+    report = {
+        "images": len(paths),
+        "generic_decode_ms": slow_s / len(paths) * 1000,
+        "fast_decode_ms": fast_s / len(paths) * 1000,
+        "pixel_mean_abs_diff": float((ref_pixels - fast_pixels).abs().mean()),
+        "max_top1_score_diff": max_diff,
+        "mismatches": mismatches,
+    }
+    print(json.dumps(report, indent=2))
+    if mismatches:
+        print(f"FAIL: {len(mismatches)} image(s) outside tolerance")
+        return 1
+    print("OK: fast decode path matches the generic path")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Load generator for the local inference server.
+
+Usage:
+    python -m benchmarks.loadgen --url http://127.0.0.1:8080/v1/text/classify \
+        --concurrency 32 --requests 2000
+
+Opens --concurrency keep-alive connections, sends --requests POSTs in total
+and reports requests/sec plus p50/p99 latency. 429 responses are counted
+separately so backpressure shows up in the report.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import urlparse
+
+SAMPLE_TEXTS = [
+    "I loved this movie, the acting was wonderful.",
+    "Terrible service, I will never come back.",
+    "It was fine.",
+    "The battery lasts all day and the screen is gorgeous, easily the best phone I have owned.",
+    "Shipping took forever and the box arrived crushed.",
+]
+
+
+async def _post(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(url, payloads, counter, total, latencies, statuses):
+    u = urlparse(url)
+    reader, writer = await asyncio.open_connection(u.hostname, u.port or 80)
+    try:
+        while counter[0] < total:
+            counter[0] += 1
+            t0 = time.perf_counter()
+            status = await _post(reader, writer, u.hostname, u.path, random.choice(payloads))
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(url, concurrency, total, payloads):
+    latencies, statuses, counter = [], {}, [0]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        _client(url, payloads, counter, total, latencies, statuses) for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - t0
+    lat = sorted(latencies)
+
+    def pct(p):
+        return lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else None
+
+    return {
+        "requests": len(lat),
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "requests_per_s": len(lat) / elapsed if elapsed else 0.0,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "status_counts": statuses,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--url", default="http://127.0.0.1:8080/v1/text/classify")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--image", action="append", default=[],
+                    help="image path to send (repeatable); implies an image route")
+    args = ap.parse_args(argv)
+
+    if args.image:
+        payloads = [{"path": p} for p in args.image]
+    else:
+        payloads = [{"text": t} for t in SAMPLE_TEXTS]
+
+    report = asyncio.run(run_load(args.url, args.concurrency, args.requests, payloads))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
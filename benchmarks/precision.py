@@ -0,0 +1,126 @@
+"""Speed, memory and accuracy drift of each precision mode against fp32.
+
+Usage:
+    python -m benchmarks.precision [--task text|image] [--images DIR] [--min-agreement 0.95]
+
+For every mode in models.precision.PRECISIONS the script loads the model,
+runs a reference set, and reports latency, throughput, weight memory and
+how closely the labels/scores match the fp32 run. Exits 1 if any mode's
+top-1 agreement with fp32 drops below --min-agreement.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from models.precision import PRECISIONS, load_pipeline
+from models.registry import model_memory_bytes, process_rss_bytes
+
+REFERENCE_TEXTS = [
+    "I absolutely loved this film, the cast was brilliant.",
+    "The worst purchase I have ever made.",
+    "It does what it says, nothing more.",
+    "Customer support resolved my issue within minutes, great experience.",
+    "The food was cold and the waiter was rude.",
+    "A surprisingly moving story with a beautiful soundtrack.",
+    "I want my money back.",
+    "Not bad, but I expected more from the sequel.",
+    "Five stars, would recommend to anyone.",
+    "The app crashes every time I open it.",
+    "Decent value for the price.",
+    "This book changed the way I think about cities.",
+    "Boring, predictable and far too long.",
+    "The hotel staff went above and beyond for us.",
+    "Setup was confusing and the manual did not help.",
+    "Honestly one of the best meals of my life.",
+]
+
+DEFAULT_MODELS = {
+    "text": ("text-classification", "distilbert-base-uncased-finetuned-sst-2-english"),
+    "image": ("image-classification", "google/vit-base-patch16-224"),
+}
+
+
+def _reference_inputs(task, images_dir):
+    if task == "text":
+        return REFERENCE_TEXTS
+    from PIL import Image
+
+    names = sorted(n for n in os.listdir(images_dir)
+                   if n.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")))
+    return [Image.open(os.path.join(images_dir, n)).convert("RGB") for n in names]
+
+
+def _top1(out):
+    # text pipelines return a dict per input, image pipelines a ranked list
+    return out[0] if isinstance(out, list) else out
+
+
+def bench_mode(task_name, model_id, precision, inputs, batch_size, repeats):
+    rss0 = process_rss_bytes()
+    t0 = time.perf_counter()
+    pipe = load_pipeline(task_name, model_id, precision)
+    load_s = time.perf_counter() - t0
+
+    pipe(inputs[:batch_size], batch_size=batch_size)  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        outputs = pipe(inputs, batch_size=batch_size)
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "precision": precision,
+        "load_s": load_s,
+        "latency_ms_per_item": elapsed / (repeats * len(inputs)) * 1000,
+        "items_per_s": repeats * len(inputs) / elapsed,
+        "weight_mb": model_memory_bytes(pipe) / (1024 * 1024),
+        "rss_delta_mb": (process_rss_bytes() - rss0) / (1024 * 1024),
+    }, [_top1(o) for o in outputs]
+
+
+def drift(reference, candidate):
+    agree = sum(r["label"] == c["label"] for r, c in zip(reference, candidate))
+    max_diff = max(
+        abs(r["score"] - c["score"]) for r, c in zip(reference, candidate) if r["label"] == c["label"]
+    ) if agree else None
+    return {"top1_agreement": agree / len(reference), "max_score_diff": max_diff}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--task", choices=sorted(DEFAULT_MODELS), default="text")
+    ap.add_argument("--model", help="override the model id")
+    ap.add_argument("--images", help="directory of reference images (image task)")
+    ap.add_argument("--batch-size", type=int, default=8)
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--min-agreement", type=float, default=0.95)
+    ap.add_argument("--json", help="also write the report to this file")
+    args = ap.parse_args(argv)
+    if args.task == "image" and not args.images:
+        ap.error("--images is required for the image task")
+
+    task_name, model_id = DEFAULT_MODELS[args.task]
+    model_id = args.model or model_id
+    inputs = _reference_inputs(args.task, args.images)
+
+    report, reference, ok = [], None, True
+    for precision in PRECISIONS:
+        row, preds = bench_mode(task_name, model_id, precision, inputs, args.batch_size, args.repeats)
+        if reference is None:
+            reference = preds
+        row.update(drift(reference, preds))
+        ok &= row["top1_agreement"] >= args.min_agreement
+        report.append(row)
+        print(json.dumps(row))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"model_id": model_id, "modes": report}, f, indent=2)
+    if not ok:
+        print(f"FAIL: a precision mode agrees with fp32 on fewer than {args.min_agreement:.0%} of inputs")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Cold-start benchmark: time from interpreter launch to a ready GUI window.
+
+Usage:
+    python -m benchmarks.startup_time [--budget 1.0] [--importtime]
+
+Runs the startup in a fresh interpreter so nothing is already imported,
+fails (exit code 1) if the window takes longer than the budget or if
+torch/transformers got imported on the way.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("torch", "transformers", "PIL")
+
+# executed in the child interpreter
+_CHILD = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+from gui.app_gui import App
+t_import = time.perf_counter() - t0
+heavy = [m for m in {heavy!r} if m in sys.modules]
+window = False
+if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+    app = App()
+    app.update_idletasks()
+    app.update()
+    window = True
+    app.destroy()
+t_ready = time.perf_counter() - t0
+print(json.dumps({{"import_s": t_import, "ready_s": t_ready, "window": window, "heavy": heavy}}))
+"""
+
+
+def measure(importtime=False):
+    """Start a fresh interpreter and return its startup report plus wall time."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", _CHILD.format(heavy=HEAVY_MODULES)]
+
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=root, capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip())
+
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    report["wall_s"] = wall
+    if importtime:
+        report["slowest_imports"] = _slowest_imports(proc.stderr)
+    return report
+
+
+def _slowest_imports(stderr, limit=15):
+    # lines look like: "import time:  self [us] | cumulative | imported package"
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, self_us, cum_us, name = [p.strip() for p in line.replace("import time:", "|").split("|")]
+        rows.append((int(cum_us), name.strip()))
+    rows.sort(reverse=True)
+    return [{"module": n, "cumulative_ms": us / 1000.0} for us, n in rows[:limit]]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--budget", type=float, default=1.0, help="max seconds until the window is ready")
+    ap.add_argument("--importtime", action="store_true", help="also list the slowest imports")
+    args = ap.parse_args(argv)
+
+    report = measure(importtime=args.importtime)
+    print(json.dumps(report, indent=2))
+
+    ok = True
+    if report["heavy"]:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(report['heavy'])}")
+        ok = False
+    if report["wall_s"] > args.budget:
+        print(f"FAIL: startup took {report['wall_s']:.3f}s (budget {args.budget:.3f}s)")
+        ok = False
+    if ok:
+        print(f"OK: startup {report['wall_s']:.3f}s within {args.budget:.3f}s budget")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
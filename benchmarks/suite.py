@@ -0,0 +1,274 @@
+"""Reproducible inference benchmarks on tiny, locally built models (no network).
+
+Usage:
+    python -m benchmarks.suite run --output results.json [--quick]
+    python -m benchmarks.suite compare baseline.json results.json [--tolerance 0.10]
+
+"run" builds randomly initialized DistilBERT- and ViT-shaped models with a
+fixed seed, then measures cold load time, first-call latency, steady-state
+latency, throughput across batch sizes and thread counts, and peak RSS.
+"compare" exits 1 if any latency grew, or any throughput fell, by more than
+the tolerance relative to the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED = 0
+
+WORDS = ("good bad great terrible movie film plot actor service food price slow fast "
+         "love hate fine okay best worst would never again really very not").split()
+
+
+def build_tiny_text_model(path):
+    """DistilBERT-shaped sentiment classifier with a small WordPiece vocab."""
+    import torch
+    from transformers import (DistilBertConfig, DistilBertForSequenceClassification,
+                              DistilBertTokenizerFast)
+
+    os.makedirs(path, exist_ok=True)
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS
+    vocab += [chr(c) for c in range(ord("a"), ord("z") + 1)]
+    vocab += ["##" + chr(c) for c in range(ord("a"), ord("z") + 1)]
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(vocab) + "\n")
+
+    torch.manual_seed(SEED)
+    config = DistilBertConfig(
+        vocab_size=len(vocab), dim=64, n_layers=2, n_heads=2, hidden_dim=128,
+        max_position_embeddings=512, num_labels=2,
+        id2label={0: "NEGATIVE", 1: "POSITIVE"}, label2id={"NEGATIVE": 0, "POSITIVE": 1},
+    )
+    DistilBertForSequenceClassification(config).save_pretrained(path)
+    DistilBertTokenizerFast(vocab_file=vocab_file, model_max_length=512).save_pretrained(path)
+    return path
+
+
+def build_tiny_image_model(path):
+    """ViT-shaped 10-class image classifier at the usual 224x224 input size."""
+    import torch
+    from transformers import ViTConfig, ViTForImageClassification, ViTImageProcessor
+
+    os.makedirs(path, exist_ok=True)
+    torch.manual_seed(SEED)
+    config = ViTConfig(
+        image_size=224, patch_size=16, hidden_size=64, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=128, num_labels=10,
+        id2label={i: f"class_{i}" for i in range(10)},
+        label2id={f"class_{i}": i for i in range(10)},
+    )
+    ViTForImageClassification(config).save_pretrained(path)
+    ViTImageProcessor(size={"height": 224, "width": 224}).save_pretrained(path)
+    return path
+
+
+def make_texts(n):
+    import random
+
+    rng = random.Random(SEED)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 60))) for _ in range(n)]
+
+
+def make_images(directory, n):
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(SEED)
+    sizes = [(640, 480), (1024, 768), (320, 320)]
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(n):
+        w, h = sizes[rng.integers(len(sizes))]
+        img = Image.fromarray(rng.integers(0, 256, (h, w, 3), dtype=np.uint8), "RGB")
+        p = os.path.join(directory, f"img_{i:04d}.jpg")
+        img.save(p, quality=85)
+        paths.append(p)
+    return paths
+
+
+# Cold load + first call must start from a fresh interpreter to mean anything
+_COLD_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from models.{module} import {cls}
+m = {cls}({model_path!r})
+m.set_config(use_result_cache=False, use_runtime_profile=False)
+m.load()
+t_load = time.perf_counter() - t0
+t1 = time.perf_counter()
+m.process({sample!r})
+t_first = time.perf_counter() - t1
+print(json.dumps({{"cold_load_s": t_load, "first_call_s": t_first}}))
+"""
+
+
+def measure_cold(module, cls, model_path, sample):
+    code = _COLD_CHILD.format(module=module, cls=cls, model_path=model_path, sample=sample)
+    env = dict(os.environ, HF_HUB_OFFLINE="1", TRANSFORMERS_OFFLINE="1")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip())
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure_warm(model, inputs, batch_sizes, thread_counts, repeats):
+    import torch
+
+    model.set_config(use_result_cache=False, use_runtime_profile=False)
+    model.load()
+    model.process(inputs[0])
+
+    lat = []
+    for x in inputs[:repeats * 4]:
+        t0 = time.perf_counter()
+        model.process(x)
+        lat.append(time.perf_counter() - t0)
+    lat.sort()
+
+    throughput = {}
+    for threads in thread_counts:
+        torch.set_num_threads(threads)
+        for bs in batch_sizes:
+            model.process_batch(inputs[:bs], batch_size=bs)  # warm this shape
+            t0 = time.perf_counter()
+            for _ in range(repeats):
+                model.process_batch(inputs, batch_size=bs)
+            elapsed = (time.perf_counter() - t0) / repeats
+            throughput[f"threads={threads},batch={bs}"] = len(inputs) / elapsed
+    return {
+        "steady_p50_ms": statistics.median(lat) * 1000,
+        "steady_p95_ms": lat[int(0.95 * (len(lat) - 1))] * 1000,
+        "throughput_items_per_s": throughput,
+    }
+
+
+def peak_rss_mb():
+    import resource
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run(args):
+    import torch
+    import transformers
+
+    from models.image_classifier import ImageClassifier
+    from models.text_classifier import TextClassifier
+
+    cpus = os.cpu_count() or 1
+    thread_counts = sorted({1, max(1, cpus // 2), cpus}) if not args.quick else [1]
+    batch_sizes = [1, 8, 32] if not args.quick else [1, 8]
+    repeats = 2 if args.quick else 5
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as work:
+        # nothing from the user's cache dir (int8 copies, profiles, results) leaks in;
+        # the cold-start children inherit this environment
+        saved_env = dict(os.environ)
+        os.environ["MODEL_CACHE_DIR"] = os.path.join(work, "cache")
+        os.environ["RUNTIME_PROFILE"] = os.path.join(work, "no-profile.json")
+        os.environ.pop("RESULT_CACHE_DB", None)
+        try:
+            text_path = build_tiny_text_model(os.path.join(work, "tiny-distilbert"))
+            image_path = build_tiny_image_model(os.path.join(work, "tiny-vit"))
+            texts = make_texts(64 if args.quick else 256)
+            images = make_images(os.path.join(work, "images"), 16 if args.quick else 64)
+
+            results = {}
+            results["text"] = measure_cold("text_classifier", "TextClassifier", text_path,
+                                           texts[0])
+            results["text"].update(measure_warm(TextClassifier(text_path), texts, batch_sizes,
+                                                thread_counts, repeats))
+            results["image"] = measure_cold("image_classifier", "ImageClassifier", image_path,
+                                            images[0])
+            results["image"].update(measure_warm(ImageClassifier(image_path), images,
+                                                 batch_sizes, thread_counts, repeats))
+            results["peak_rss_mb"] = peak_rss_mb()
+        finally:
+            os.environ.clear()
+            os.environ.update(saved_env)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            "machine": platform.machine(),
+            "cpus": cpus,
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "transformers": transformers.__version__,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def _flatten(d, prefix=""):
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(_flatten(v, key + "."))
+        elif isinstance(v, (int, float)):
+            out[key] = float(v)
+    return out
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        base = _flatten(json.load(f)["results"])
+    with open(args.current) as f:
+        cur = _flatten(json.load(f)["results"])
+
+    regressions = []
+    for key in sorted(base.keys() & cur.keys()):
+        old, new = base[key], cur[key]
+        if old <= 0:
+            continue
+        change = (new - old) / old
+        # throughput: higher is better; latency, load time and memory: lower is better
+        worse = -change if "throughput" in key else change
+        flag = "REGRESSION" if worse > args.tolerance else ""
+        print(f"{key:55s} {old:12.3f} -> {new:12.3f} ({change:+.1%}) {flag}")
+        if flag:
+            regressions.append(key)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        return 1
+    print(f"\nNo regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="run the suite and write JSON results")
+    p.add_argument("--output", default="bench_results.json")
+    p.add_argument("--quick", action="store_true", help="fewer sizes/repeats for a smoke run")
+    p.set_defaults(func=run)
+    p = sub.add_parser("compare", help="flag regressions against a saved baseline")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--tolerance", type=float, default=0.10)
+    p.set_defaults(func=compare)
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Tokens/sec for batched text inference with and without length bucketing.
+
+Usage:
+    python -m benchmarks.text_bucketing [--texts 512] [--batch-size 32] [--seed 0]
+
+Builds a mixed-length corpus (mostly short texts with a long tail, like
+real reviews), runs it through TextClassifier.process_batch with
+length_bucketing on and off, and reports real (non-pad) tokens per second
+alongside the fraction of computed positions that were padding.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from models.text_classifier import TextClassifier
+
+WORDS = (
+    "the movie was great terrible plot acting service food price quality "
+    "really not very good bad amazing slow fast would recommend never again "
+    "delivery arrived broken love hate okay fine best worst experience staff"
+).split()
+
+
+def mixed_corpus(n, seed):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        # ~70% short, ~25% medium, ~5% near the 512-token limit
+        r = rng.random()
+        length = rng.randint(3, 20) if r < 0.7 else rng.randint(40, 150) if r < 0.95 else rng.randint(300, 480)
+        texts.append(" ".join(rng.choice(WORDS) for _ in range(length)))
+    return texts
+
+
+def padding_stats(lengths, order, batch_size):
+    """Real vs padded token positions when batches are taken in the given order."""
+    real = padded = 0
+    for start in range(0, len(order), batch_size):
+        batch = [lengths[i] for i in order[start:start + batch_size]]
+        real += sum(batch)
+        padded += max(batch) * len(batch)
+    return real, padded
+
+
+def run(model, texts, batch_size, bucketing, repeats):
+    model.set_config(length_bucketing=bucketing)
+    model.process_batch(texts[:batch_size], batch_size=batch_size)  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        model.process_batch(texts, batch_size=batch_size)
+    return (time.perf_counter() - t0) / repeats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--texts", type=int, default=512)
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--model", help="override the model id")
+    args = ap.parse_args(argv)
+
+    model = TextClassifier(args.model) if args.model else TextClassifier()
+    # measure inference, not the result cache
+    model.set_config(use_result_cache=False, long_text=False)
+    nlp = model.load()
+
+    texts = mixed_corpus(args.texts, args.seed)
+    lengths = [len(ids) + nlp.tokenizer.num_special_tokens_to_add()
+               for ids in nlp.tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+    report = {}
+    for bucketing in (False, True):
+        order = sorted(range(len(texts)), key=lengths.__getitem__) if bucketing else list(range(len(texts)))
+        real, padded = padding_stats(lengths, order, args.batch_size)
+        seconds = run(model, texts, args.batch_size, bucketing, args.repeats)
+        report["bucketed" if bucketing else "unbucketed"] = {
+            "seconds": seconds,
+            "texts_per_s": len(texts) / seconds,
+            "tokens_per_s": real / seconds,
+            "padding_fraction": 1 - real / padded,
+        }
+    report["speedup"] = report["unbucketed"]["seconds"] / report["bucketed"]["seconds"]
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
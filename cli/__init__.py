@@ -0,0 +1 @@
+# Empty file to make cli a package
\ No newline at end of file
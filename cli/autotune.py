@@ -0,0 +1,92 @@
+import json
+import os
+import sys
+import tempfile
+
+from cli.classify import TASKS
+from models.precision import PRECISIONS
+
+SAMPLE_TEXT = ("The service was quick and friendly, though the food took a while to arrive "
+               "and the dessert was disappointing.")
+
+
+def add_arguments(parser):
+    parser.add_argument("--task", choices=sorted(TASKS), action="append",
+                        help="model(s) to tune (repeatable; default: all)")
+    parser.add_argument("--model", help="override the Hugging Face model id (with one --task)")
+    parser.add_argument("--input", help="sample inputs: a .txt file (text) or an image directory")
+    parser.add_argument("--threads", help="comma-separated thread counts (default: 1,2,4..cpus)")
+    parser.add_argument("--batch-sizes", default="1,4,8,16,32,64")
+    parser.add_argument("--max-latency-ms", type=float,
+                        help="best throughput whose per-batch latency stays under this bound")
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32",
+                        help="tune the model at this precision (profiles are kept per precision)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--dry-run", action="store_true", help="print results, don't save")
+
+
+def _ints(csv_text):
+    return [int(x) for x in csv_text.split(",") if x.strip()] if csv_text else None
+
+
+def _sample_inputs(task, path, tmp_dir):
+    if task == "text":
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f if line.strip()]
+            return lines[:64]
+        return [SAMPLE_TEXT] * 8
+    if path:
+        from models.image_classifier import IMAGE_EXTENSIONS
+        files = sorted(os.path.join(path, n) for n in os.listdir(path)
+                       if n.lower().endswith(IMAGE_EXTENSIONS))
+        return files[:64]
+    from PIL import Image
+
+    # synthetic photo-sized JPEGs so decode cost is representative
+    files = []
+    for i in range(8):
+        p = os.path.join(tmp_dir, f"sample_{i}.jpg")
+        Image.frombytes("RGB", (800, 600), os.urandom(800 * 600 * 3)).save(p, quality=85)
+        files.append(p)
+    return files
+
+
+def run(args):
+    from models.tuning import autotune, profile_path, save_model_profile
+
+    tasks = args.task or sorted(TASKS)
+    if args.model and len(tasks) != 1:
+        print("--model needs exactly one --task", file=sys.stderr)
+        return 2
+
+    for task in tasks:
+        model_class, _ = TASKS[task]
+        model = model_class(args.model) if args.model else model_class()
+        # tune the raw forward pass, not the cache or the batcher
+        model.set_config(use_result_cache=False, micro_batching=False, precision=args.precision)
+        with tempfile.TemporaryDirectory(prefix="autotune-") as tmp_dir:
+            inputs = _sample_inputs(task, args.input, tmp_dir)
+            if not inputs:
+                print(f"No sample inputs for {task}", file=sys.stderr)
+                return 1
+
+            print(f"Tuning {task} ({model.model_id}, {args.precision})...", file=sys.stderr)
+            best, trials = autotune(
+                model, inputs, thread_counts=_ints(args.threads),
+                batch_sizes=_ints(args.batch_sizes), max_latency_ms=args.max_latency_ms,
+                repeats=args.repeats,
+            )
+        for t in trials:
+            print(f"  threads={t['num_threads']:<3} batch={t['batch_size']:<4} "
+                  f"{t['batch_latency_ms']:9.1f} ms/batch {t['throughput']:9.1f} items/s",
+                  file=sys.stderr)
+        print(json.dumps({"task": task, "model_id": model.model_id,
+                          "precision": args.precision, **best}))
+        if not args.dry_run:
+            save_model_profile(model.model_id, best, args.precision)
+        model.close()
+
+    if not args.dry_run:
+        print(f"Profile saved to {profile_path()}", file=sys.stderr)
+    return 0
@@ -0,0 +1,59 @@
+import itertools
+import json
+import sys
+import time
+
+from cli.classify import TASKS, read_records
+
+
+def add_arguments(parser):
+    parser.add_argument("--task", choices=sorted(TASKS), required=True)
+    parser.add_argument("--input", required=True, help="labelled sample: .jsonl, .csv or .txt")
+    parser.add_argument("--field", help="record field holding the text / image path")
+    parser.add_argument("--label-field", help="gold label field, to also report accuracy")
+    parser.add_argument("--model", help="override the full model id")
+    parser.add_argument("--first-model", help="smaller first-stage checkpoint (default: the full model)")
+    parser.add_argument("--first-precision", default="int8", help="first-stage precision")
+    parser.add_argument("--target", type=float, default=0.99,
+                        help="required agreement with the full model (0-1)")
+    parser.add_argument("--limit", type=int, default=2000, help="records to sample")
+    parser.add_argument("--batch-size", type=int, default=32)
+
+
+def run(args):
+    from models.cascade import build_cascade, calibrate
+
+    model_class, default_field = TASKS[args.task]
+    field = args.field or default_field
+    full = model_class(args.model) if args.model else model_class()
+    full.set_config(use_result_cache=False)
+    cascade = build_cascade(full, args.first_model, args.first_precision)
+
+    records = list(itertools.islice(read_records(args.input, field), args.limit))
+    inputs = [str(r.get(field, "")) for r in records]
+    truth = [r.get(args.label_field) for r in records] if args.label_field else None
+    if not inputs:
+        print("No records in the sample", file=sys.stderr)
+        return 1
+
+    timings = {}
+    results = {}
+    for name, model in (("first", cascade.first), ("full", full)):
+        model.warmup()
+        t0 = time.perf_counter()
+        results[name] = model.process_batch(inputs, batch_size=args.batch_size)
+        timings[name] = (time.perf_counter() - t0) / len(inputs)
+
+    report = calibrate(results["first"], results["full"], args.target, truth)
+    # expected per-input cost: every input pays stage one, escalations also pay stage two
+    cost = timings["first"] + (1 - report["first_stage_hit_rate"]) * timings["full"]
+    report.update({
+        "first_model": cascade.first.model_id,
+        "first_precision": args.first_precision,
+        "full_model": full.model_id,
+        "first_ms_per_input": timings["first"] * 1000,
+        "full_ms_per_input": timings["full"] * 1000,
+        "estimated_speedup": timings["full"] / cost if cost > 0 else None,
+    })
+    print(json.dumps(report, indent=2))
+    return 0
@@ -0,0 +1,271 @@
+import csv
+import json
+import os
+import sys
+import time
+
+from models.batching import process_batch_isolated
+from models.text_classifier import TextClassifier
+from models.image_classifier import ImageClassifier
+from models.tuning import get_model_profile
+
+TASKS = {
+    "text": (TextClassifier, "text"),
+    "image": (ImageClassifier, "path"),
+}
+
+DEFAULT_BATCH_SIZE = 32  # when neither --batch-size nor an autotuned profile gives one
+
+
+def add_arguments(parser):
+    parser.add_argument("--task", choices=sorted(TASKS), required=True)
+    parser.add_argument("--input", required=True, help=".jsonl, .csv or .txt (one record per line)")
+    parser.add_argument("--output", required=True, help=".jsonl or .csv, written incrementally")
+    parser.add_argument("--field", help="record field holding the text / image path "
+                                        "(default: text / path)")
+    parser.add_argument("--model", help="override the Hugging Face model id")
+    parser.add_argument("--batch-size", type=int,
+                        help=f"default: the autotuned profile, else {DEFAULT_BATCH_SIZE}")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="forked worker processes sharing the model weights (Linux/macOS)")
+    parser.add_argument("--cascade-threshold", type=float,
+                        help="run a cheap first stage and send only inputs scoring below "
+                             "this to the full model (see 'calibrate')")
+    parser.add_argument("--first-model", help="cascade first-stage checkpoint (default: the "
+                                              "full model)")
+    parser.add_argument("--first-precision", default="int8", help="cascade first-stage precision")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip records already present in --output and append")
+    parser.add_argument("--report-every", type=int, default=1000,
+                        help="print throughput every N records")
+
+
+def read_records(path, field):
+    """Yield input records one at a time as dicts, never loading the whole file.
+
+    A .jsonl line that is not a JSON object raises ValueError naming the line.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if ext == ".csv":
+            for row in csv.DictReader(f):
+                yield row
+        elif ext == ".jsonl":
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_no}: invalid JSON ({e})")
+                if not isinstance(rec, dict):
+                    raise ValueError(f"{path}:{line_no}: expected a JSON object, "
+                                     f"got {type(rec).__name__}")
+                yield rec
+        else:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if line:
+                    yield {field: line}
+
+
+def _complete_jsonl(f):
+    """(records, end offset) of the whole, parseable lines at the start of f."""
+    count = end = 0
+    for line in f:
+        if not line.endswith(b"\n"):
+            break
+        if line.strip():
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            count += 1
+        end += len(line)
+    return count, end
+
+
+def _complete_csv(f):
+    """(records incl. header, end offset) of the whole CSV records at the start of f.
+
+    Quoted fields may span lines, so records are counted by csv.reader; one
+    still open at end of file, or missing its line terminator, is incomplete.
+    """
+    read = {"bytes": 0, "newline": True}
+
+    def lines():
+        for raw in f:
+            read["bytes"] += len(raw)
+            read["newline"] = raw.endswith(b"\n")
+            yield raw.decode("utf-8")
+
+    count = end = 0
+    reader = csv.reader(lines(), strict=True)
+    while True:
+        try:
+            next(reader)
+        except (StopIteration, csv.Error):
+            break
+        if not read["newline"]:
+            break
+        count += 1
+        end = read["bytes"]
+    return count, end
+
+
+def completed_records(path):
+    """Number of whole records already in an output file, read as a stream.
+
+    Anything after the last complete record (an interrupted write) is
+    truncated away.
+    """
+    if not os.path.exists(path):
+        return 0
+    is_csv = path.lower().endswith(".csv")
+    with open(path, "rb") as f:
+        count, end = _complete_csv(f) if is_csv else _complete_jsonl(f)
+    if end != os.path.getsize(path):
+        with open(path, "rb+") as f:
+            f.truncate(end)
+    if is_csv:
+        count = max(0, count - 1)  # header
+    return count
+
+
+class ResultWriter:
+    """Append results to .jsonl or .csv, flushing after every batch.
+
+    Input fields are copied through; one that shares a name with an output
+    column (label/score/result/error) is rejected rather than overwritten.
+    """
+
+    def __init__(self, path, task, append):
+        self._csv = path.lower().endswith(".csv")
+        self._task = task
+        if self._csv and task == "text":
+            self._columns = ("label", "score", "error")
+        else:
+            self._columns = ("result", "error")
+        self._f = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        self._writer = None
+        self._has_header = append and self._f.tell() > 0
+
+    def write(self, record, result, error=None):
+        clash = [c for c in self._columns if c in record]
+        if clash:
+            raise ValueError(f"input field {clash[0]!r} clashes with an output column; "
+                             f"rename it in the input")
+        if not self._csv:
+            row = dict(record)
+            if error is None:
+                row["result"] = result
+            else:
+                row["error"] = error
+            self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            return
+
+        row = dict(record)
+        if self._task == "text":
+            row["label"] = result["label"] if result else ""
+            row["score"] = result["score"] if result else ""
+        else:
+            row["result"] = json.dumps(result) if result is not None else ""
+        row["error"] = error or ""
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._f, fieldnames=list(row), extrasaction="ignore")
+            if not self._has_header:
+                self._writer.writeheader()
+        self._writer.writerow(row)
+
+    def flush(self):
+        self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+
+def _batches(records, size):
+    batch = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run(args):
+    model_class, default_field = TASKS[args.task]
+    field = args.field or default_field
+    model = model_class(args.model) if args.model else model_class()
+
+    skip = completed_records(args.output) if args.resume else 0
+    if skip:
+        print(f"Resuming after {skip} records already in {args.output}", file=sys.stderr)
+
+    records = read_records(args.input, field)
+    for _ in range(skip):
+        if next(records, None) is None:
+            break
+
+    profile = get_model_profile(model.model_id, model.precision) or {}
+    batch_size = args.batch_size or profile.get("batch_size", DEFAULT_BATCH_SIZE)
+
+    cascade = None
+    if args.cascade_threshold is not None:
+        if args.workers > 1:
+            print("--cascade-threshold does not combine with --workers", file=sys.stderr)
+            return 2
+        from models.cascade import build_cascade
+        model = cascade = build_cascade(model, args.first_model, args.first_precision,
+                                        args.cascade_threshold)
+
+    pool = None
+    if args.workers > 1:
+        from models.worker_pool import ForkedWorkerPool
+        pool = ForkedWorkerPool(model, workers=args.workers)
+
+    writer = ResultWriter(args.output, args.task, append=bool(skip))
+    done = errors = 0
+    next_report = args.report_every
+    t0 = time.perf_counter()
+    try:
+        # read enough records per step to give every worker a batch
+        for batch in _batches(records, batch_size * max(1, args.workers)):
+            # a record without the field gets an error row instead of scoring ""
+            classified = [(None, f"record has no {field!r} field")] * len(batch)
+            present = [i for i, rec in enumerate(batch) if rec.get(field) is not None]
+            if present:
+                inputs = [str(batch[i][field]) for i in present]
+                for i, res in zip(present, process_batch_isolated(model, inputs, batch_size,
+                                                                  runner=pool)):
+                    classified[i] = res
+            for rec, (result, error) in zip(batch, classified):
+                writer.write(rec, result, error)
+                errors += error is not None
+            writer.flush()
+            done += len(batch)
+            if done >= next_report:
+                rate = done / (time.perf_counter() - t0)
+                print(f"{done} records, {rate:.1f} records/s", file=sys.stderr)
+                next_report += args.report_every
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print(f"Interrupted after {skip + done} records; rerun with --resume to continue",
+              file=sys.stderr)
+        return 130
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.close()
+
+    elapsed = time.perf_counter() - t0
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"Done: {done} records ({errors} errors) in {elapsed:.1f}s, {rate:.1f} records/s",
+          file=sys.stderr)
+    if cascade is not None:
+        print(f"Cascade: {json.dumps(cascade.stats())}", file=sys.stderr)
+    return 0
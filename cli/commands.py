@@ -0,0 +1,45 @@
+import argparse
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py", description="Headless commands (run without arguments for the GUI)."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    from cli import classify
+    p = sub.add_parser("classify", help="stream a JSONL/CSV/TXT file through a classifier")
+    classify.add_arguments(p)
+    p.set_defaults(func=classify.run)
+
+    from cli import serve
+    p = sub.add_parser("serve", help="run the local HTTP inference server")
+    serve.add_arguments(p)
+    p.set_defaults(func=serve.run)
+
+    from cli import calibrate
+    p = sub.add_parser("calibrate", help="pick a cascade confidence threshold on a sample")
+    calibrate.add_arguments(p)
+    p.set_defaults(func=calibrate.run)
+
+    from cli import scan
+    p = sub.add_parser("scan", help="incremental folder classification with a results store")
+    scan.add_arguments(p)
+    p.set_defaults(func=scan.run)
+
+    from cli import index
+    p = sub.add_parser("index", help="image similarity index: add, query, build-ivf")
+    index.add_arguments(p)
+    p.set_defaults(func=index.run)
+
+    from cli import autotune
+    p = sub.add_parser("autotune", help="sweep threads/batch sizes and save a per-host profile")
+    autotune.add_arguments(p)
+    p.set_defaults(func=autotune.run)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+import time
+
+
+def add_arguments(parser):
+    parser.add_argument("--index", required=True, help="index directory (created on first add)")
+    parser.add_argument("--model", help="override the Hugging Face model id")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--dtype", choices=("float32", "float16"), default="float16",
+                        help="storage type for a new index")
+    sub = parser.add_subparsers(dest="action", required=True)
+    p = sub.add_parser("add", help="embed images (files or directories) not yet in the index")
+    p.add_argument("paths", nargs="+")
+    p = sub.add_parser("query", help="find the images most similar to one image")
+    p.add_argument("image")
+    p.add_argument("-k", type=int, default=10)
+    p.add_argument("--nprobe", type=int, help="IVF clusters to scan (0 = exact)")
+    p = sub.add_parser("build-ivf", help="cluster the index for approximate search")
+    p.add_argument("--lists", type=int, help="number of clusters (default ~4*sqrt(N))")
+
+
+def _expand(paths):
+    from models.image_classifier import IMAGE_EXTENSIONS, list_images
+
+    for p in paths:
+        if os.path.isdir(p):
+            yield from list_images(p)
+        elif p.lower().endswith(IMAGE_EXTENSIONS):
+            yield p
+
+
+def _open_index(args, model=None):
+    from models.embedding_index import EmbeddingIndex
+
+    if os.path.exists(os.path.join(args.index, "meta.json")) or model is None:
+        return EmbeddingIndex(args.index)
+    hidden = model.load().model.config.hidden_size
+    return EmbeddingIndex(args.index, dim=hidden, dtype=args.dtype)
+
+
+def run(args):
+    from models.image_classifier import ImageClassifier
+
+    if args.action == "build-ivf":
+        index = _open_index(args)
+        t0 = time.perf_counter()
+        lists = index.build_ivf(n_lists=args.lists)
+        print(f"Built {lists} clusters over {len(index)} vectors in "
+              f"{time.perf_counter() - t0:.1f}s", file=sys.stderr)
+        return 0
+
+    model = ImageClassifier(args.model) if args.model else ImageClassifier()
+    index = _open_index(args, model)
+
+    if args.action == "query":
+        vector = model.embed(os.path.abspath(args.image))
+        for key, score in index.search(vector, k=args.k, nprobe=args.nprobe,
+                                       exclude=[os.path.abspath(args.image)]):
+            print(json.dumps({"path": key, "score": round(score, 4)}))
+        return 0
+
+    # add: only files the index has not seen, so reruns pick up new images only
+    paths = [p for p in map(os.path.abspath, _expand(args.paths)) if p not in index]
+    added, t0 = 0, time.perf_counter()
+    for start in range(0, len(paths), args.batch_size * 8):
+        chunk = paths[start:start + args.batch_size * 8]
+        index.add(chunk, model.embed_batch(chunk, batch_size=args.batch_size))
+        added += len(chunk)
+        rate = added / (time.perf_counter() - t0)
+        print(f"{added}/{len(paths)} images, {rate:.1f} images/s", file=sys.stderr)
+    print(f"Index has {len(index)} images", file=sys.stderr)
+    return 0
@@ -0,0 +1,67 @@
+import json
+import sys
+import time
+
+from models.precision import PRECISIONS
+
+
+def add_arguments(parser):
+    parser.add_argument("--db", help="results store (default: <cache dir>/folder_scan.db)")
+    parser.add_argument("--model", help="override the Hugging Face model id")
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32",
+                        help="results are stored per precision")
+    sub = parser.add_subparsers(dest="action", required=True)
+    p = sub.add_parser("run", help="classify new or changed images under a folder")
+    p.add_argument("folder")
+    p.add_argument("--batch-size", type=int, default=32)
+    p.add_argument("--no-recursive", action="store_true")
+    p.add_argument("--keep-missing", action="store_true",
+                   help="keep rows for files that no longer exist")
+    p = sub.add_parser("query", help="look up stored results without running the model")
+    p.add_argument("--label", help="case-insensitive substring of the label")
+    p.add_argument("--min-score", type=float, default=0.0)
+    p.add_argument("--top1", action="store_true", help="match only each file's best label")
+    p.add_argument("--under", help="only files under this folder")
+    p.add_argument("--limit", type=int, default=100)
+    p.add_argument("--counts", action="store_true", help="files per top label instead")
+
+
+def run(args):
+    from models.folder_scan import FolderScanner, ScanStore, scan_key
+    from models.image_classifier import ImageClassifier
+
+    store = ScanStore(args.db)
+    try:
+        if args.action == "query":
+            key = None  # all models
+            if args.model or args.precision != "fp32":
+                key = scan_key(args.model or ImageClassifier().model_id, args.precision)
+            if args.counts:
+                print(json.dumps(store.label_counts(key, args.min_score, args.under), indent=2))
+                return 0
+            for row in store.query(args.label, args.min_score, key, args.top1,
+                                   args.under, args.limit):
+                print(json.dumps(row))
+            return 0
+
+        model = ImageClassifier(args.model) if args.model else ImageClassifier()
+        model.set_config(precision=args.precision)
+        t0 = time.perf_counter()
+
+        def progress(c):
+            rate = c["classified"] / (time.perf_counter() - t0)
+            print(f"{c['seen']} files seen, {c['classified']} classified, {c['errors']} errors, "
+                  f"{rate:.1f} images/s", file=sys.stderr)
+
+        counts = FolderScanner(model, store).scan(
+            args.folder, batch_size=args.batch_size, recursive=not args.no_recursive,
+            prune=not args.keep_missing, progress=progress,
+        )
+        print(json.dumps(counts))
+        print(f"Scanned in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+        return 0
+    except KeyboardInterrupt:
+        print("Interrupted; finished batches are saved, rerun to continue", file=sys.stderr)
+        return 130
+    finally:
+        store.close()
@@ -0,0 +1,23 @@
+def add_arguments(parser):
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--tasks", default="text,image", help="comma-separated: text,image")
+    parser.add_argument("--max-batch", type=int, default=32, help="largest coalesced batch")
+    parser.add_argument("--max-wait-ms", type=float, default=5, help="how long to wait to fill a batch")
+    parser.add_argument("--max-queue", type=int, default=256, help="queued items before answering 429")
+    parser.add_argument("--no-warmup", action="store_true", help="load models on first request")
+
+
+def run(args):
+    from server.http_server import run_server
+
+    run_server(
+        host=args.host,
+        port=args.port,
+        tasks=[t.strip() for t in args.tasks.split(",") if t.strip()],
+        max_batch_size=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+        max_queue_size=args.max_queue,
+        warmup=not args.no_warmup,
+    )
+    return 0
@@ -1,15 +1,61 @@
 import tkinter as tk
 from tkinter import ttk
-import threading
-from gui.widgets import LabeledText, FilePicker, OutputBox
+import time
+from collections import Counter
+from gui.widgets import LabeledText, FilePicker, OutputBox, OutputLog, VirtualOutputView
 from models.text_classifier import TextClassifier
 from models.image_classifier import ImageClassifier
+from models.cache import get_default_cache
+from models.batching import process_batch_isolated
+from models.registry import ModelRegistry, get_weight_cache
+from models.precision import PRECISIONS
+from utils.metrics import get_metrics
+from utils.jobs import (
+    JobExecutor, JobQueueFull, DONE, CANCELLED, TIMED_OUT, current_job, check_cancelled
+)
+from utils.log import request_context
 
 MODEL_CHOICES = {
     "Text-to-Sentiment": ("text", TextClassifier),
     "Image Classification": ("image", ImageClassifier),
 }
 
+# Idle models are evicted (least recently used first) above this much weight memory
+MODEL_MEMORY_BUDGET_MB = 2048
+
+# Background job executor: worker threads, max queued jobs, per-job timeout (s)
+JOB_WORKERS = 2
+JOB_QUEUE_SIZE = 32
+JOB_TIMEOUT_S = 300
+JOB_POLL_MS = 100
+
+# Text files larger than this are scored from disk as a long document
+# instead of being pasted into the input box
+LARGE_FILE_BYTES = 256 * 1024
+
+# Output panel: records kept in memory (all of them are spooled to disk for
+# Save Output) and the max redraw rate
+OUTPUT_MAX_RECORDS = 5000
+OUTPUT_FPS = 20
+
+# Folder scans and line-by-line file runs can take hours
+LONG_JOB_TIMEOUT_S = 6 * 3600
+
+# Line-by-line mode: lines per process_batch call, seconds between sample results
+BULK_CHUNK_LINES = 256
+BULK_SAMPLE_S = 2.0
+
+# Load + warm every model in the background at startup, not just the selected one
+PREWARM_ALL_AT_STARTUP = False
+
+STATUS_TEXT = {
+    "idle": ("⚪ Not loaded", "gray"),
+    "loading": ("🔄 Loading...", "blue"),
+    "loaded": ("🔄 Warming up...", "blue"),
+    "ready": ("🟢 Ready", "green"),
+    "error": ("❌ Load failed", "red"),
+}
+
 
 class App(tk.Tk):
     def __init__(self):
@@ -42,6 +88,11 @@ class App(tk.Tk):
         model_combo.pack(side="left", fill="x", expand=True)
         model_combo.bind("<<ComboboxSelected>>", self._on_model_change)
 
+        self.model_status_label = tk.Label(
+            model_inner, text="", bg="#f0f0f0", font=("Arial", 9)
+        )
+        self.model_status_label.pack(side="left", padx=(8, 0))
+
         # Create horizontal container for User Input and Model Output sections (50/50 split)
         horizontal_frame = tk.Frame(main_frame, bg="#f0f0f0")
         horizontal_frame.pack(fill="both", expand=True, pady=5)
@@ -112,8 +163,11 @@ class App(tk.Tk):
         output_label = tk.Label(output_frame, text="Output Display:", bg="#f0f0f0")
         output_label.pack(anchor="w", padx=5, pady=(5, 0))
 
-        self.output_text = tk.Text(output_frame, height=6, width=20, state="disabled")
-        self.output_text.pack(fill="both", expand=True, padx=5, pady=5)
+        self.output_log = OutputLog(capacity=OUTPUT_MAX_RECORDS)
+        self.output_view = VirtualOutputView(
+            output_frame, self.output_log, fps=OUTPUT_FPS, height=6, width=20
+        )
+        self.output_view.pack(fill="both", expand=True, padx=5, pady=5)
 
         # Buttons (below the horizontal sections)
         button_frame = tk.Frame(main_frame, bg="#f0f0f0")
@@ -132,7 +186,13 @@ class App(tk.Tk):
         )
         clear_btn.pack(side="left")
 
-        # Loading indicator (initially hidden)
+        self.cancel_btn = tk.Button(
+            button_frame, text="Cancel", command=self.cancel_jobs,
+            font=("Arial", 9), padx=12, pady=5, state="disabled"
+        )
+        self.cancel_btn.pack(side="left", padx=(10, 0))
+
+        # Job status indicator (hidden while no jobs are active)
         self.loading_frame = tk.Frame(button_frame, bg="#f0f0f0")
         self.loading_frame.pack(side="left", padx=(10, 0))
         
@@ -142,6 +202,14 @@ class App(tk.Tk):
         )
         # Don't pack yet - will show during loading
 
+        # Live progress of line-by-line jobs (empty while none run)
+        progress_frame = tk.Frame(main_frame, bg="#f0f0f0")
+        progress_frame.pack(fill="x")
+        self.progress_label = tk.Label(
+            progress_frame, text="", bg="#f0f0f0", font=("Arial", 9), fg="blue",
+            justify="left", anchor="w"
+        )
+
         # Model Information & Explanation
         info_frame = tk.LabelFrame(
             main_frame, text="Model Information & Explanation", bg="#f0f0f0"
@@ -198,7 +266,15 @@ class App(tk.Tk):
         # tk.Label(notes_frame, text="Notes: Extra notes, instructions, or references.",
         #         bg='#f0f0f0', font=('Arial', 9)).pack(anchor="w")
 
-        self._instances = {}
+        self._registry = ModelRegistry(max_param_mb=MODEL_MEMORY_BUDGET_MB)
+        self._jobs = JobExecutor(
+            workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE, default_timeout=JOB_TIMEOUT_S
+        )
+        self._watched_jobs = []  # submitted jobs whose results are not shown yet
+        self._prewarm_jobs = []  # background loads; results are not displayed
+        self._bulk_progress = {}  # job id -> progress dict, updated by line-by-line jobs
+        self._document_path = None  # large file opened via File > Open
+        self._document_preview = None
         self._update_model_interface()
         self._update_input_visibility()
         self._update_model_info()  # Add this line
@@ -208,6 +284,16 @@ class App(tk.Tk):
         self.write_output(f"Model selected: {initial_model}")
         # self.write_output("Ready to process input...")
 
+        self.after(JOB_POLL_MS, self._poll_jobs)
+
+        # start loading only once the window is up, so startup stays fast
+        self._show_model_status()
+        self.after_idle(self._prewarm, initial_model)
+        if PREWARM_ALL_AT_STARTUP:
+            for name in MODEL_CHOICES:
+                if name != initial_model:
+                    self.after_idle(self._prewarm, name)
+
     def create_menu(self):
         menubar = tk.Menu(self)
         self.config(menu=menubar)
@@ -222,6 +308,10 @@ class App(tk.Tk):
             command=self.open_input_file,
             accelerator="Ctrl+O",
         )
+        file_menu.add_command(
+            label="Classify File Line by Line...", command=self.classify_file_lines
+        )
+        file_menu.add_command(label="Scan Image Folder...", command=self.scan_folder)
         file_menu.add_separator()
         file_menu.add_command(
             label="Save Output", command=self.save_output, accelerator="Ctrl+S"
@@ -238,7 +328,7 @@ class App(tk.Tk):
         models_menu.add_command(
             label="Model Information...", command=self.show_model_info
         )
-        # models_menu.add_command(label="Performance Stats", command=self.show_performance_stats)
+        models_menu.add_command(label="Performance Stats", command=self.show_performance_stats)
         models_menu.add_command(
             label="Clear Model Cache", command=self.clear_model_cache
         )
@@ -246,6 +336,18 @@ class App(tk.Tk):
         models_menu.add_command(
             label="Reload Current Model", command=self.reload_current_model
         )
+
+        # Precision submenu (fp32 / bf16 autocast / dynamic int8)
+        self.precision_var = tk.StringVar(value="fp32")
+        # plain copy for job threads, which must not touch Tk variables
+        self._precision = self.precision_var.get()
+        precision_menu = tk.Menu(models_menu, tearoff=0)
+        for mode in PRECISIONS:
+            precision_menu.add_radiobutton(
+                label=mode, value=mode, variable=self.precision_var,
+                command=self._on_precision_change,
+            )
+        models_menu.add_cascade(label="Precision", menu=precision_menu)
         menubar.add_cascade(label="Models", menu=models_menu)
 
         # Help menu
@@ -278,6 +380,68 @@ class App(tk.Tk):
         self.write_output(f"Model selected: {selected_model}")
         self._update_model_interface()
         self._update_model_info()
+        self._prewarm(selected_model)
+
+    def _model_factory(self, model_name):
+        def build():
+            _, model_class = MODEL_CHOICES[model_name]
+            model = model_class()
+            # concurrent clicks share forward passes instead of contending
+            model.set_config(micro_batching=True, precision=self._precision)
+            return model
+        return build
+
+    def _on_precision_change(self):
+        """Apply the chosen precision to every resident model and rewarm the current one."""
+        precision = self._precision = self.precision_var.get()
+        for row in self._registry.resident():
+            model = self._registry.peek(row["name"])
+            previous = model.precision
+            model.set_config(precision=precision)
+            if previous != precision:
+                # otherwise the old copy of the weights stays cached until exit
+                get_weight_cache().drop(model.model_id, model.task_name, variant=previous)
+        self.write_output(f"Precision set to {precision}.")
+        self._prewarm(self.model_var.get())
+
+    def _get_instance(self, model_name):
+        """Get or create the model instance for a menu entry (constructed once)."""
+        return self._registry.get(model_name, self._model_factory(model_name))
+
+    def _prewarm(self, model_name):
+        """Load and warm a model in the background so the first run is fast."""
+        model = self._get_instance(model_name)
+        self._show_model_status()
+        if model.status == "ready" and model.is_loaded:
+            return
+
+        def work():
+            try:
+                model.warmup()
+                self._registry.enforce_budget()
+            except Exception as e:
+                self.write_output(f"❌ ERROR loading {model_name}: {e}")
+
+        # on the job executor, so loads count as running jobs and share its limits
+        try:
+            self._prewarm_jobs.append(self._jobs.submit(work, name=f"Load {model_name}"))
+        except JobQueueFull:
+            return  # the next run loads it on demand
+        self._update_job_status()
+        # loading flips status on the worker thread; poll until it settles
+        self.after(200, self._poll_model_status)
+
+    def _poll_model_status(self):
+        self._show_model_status()
+        model = self._registry.peek(self.model_var.get())
+        if model is not None and model.status in ("loading", "loaded"):
+            self.after(200, self._poll_model_status)
+
+    def _show_model_status(self):
+        model = self._registry.peek(self.model_var.get())
+        status = model.status if model is not None else "idle"
+        text, color = STATUS_TEXT.get(status, STATUS_TEXT["idle"])
+        self.model_status_label.config(text=text, fg=color)
 
     def _update_model_interface(self):
         """Update interface based on selected model type"""
@@ -370,93 +534,288 @@ class App(tk.Tk):
         self.write_output(f"Loading model: {self.model_var.get()}")
 
     def run_model(self):
-        """Run model with loading indicator and threading"""
+        """Queue a model run on the background job executor"""
         model_name = self.model_var.get()
         input_type = self.input_type.get()
 
+        document = False
         if input_type == "text":
             input_data = self.text_input.get("1.0", "end").strip()
             if not input_data:
                 self.write_output("ERROR: Text input is empty.")
                 return
+            # an untouched preview of a large file means: score the whole file
+            if self._document_path and input_data == self._document_preview:
+                input_data, document = self._document_path, True
         else:
             input_data = self.image_path.get()
             if not input_data:
                 self.write_output("ERROR: No image file selected.")
                 return
 
-        # Start loading state
-        self._start_loading()
-        
-        # Run model processing in separate thread to prevent UI freezing
-        thread = threading.Thread(
-            target=self._process_model_async, 
-            args=(model_name, input_data), 
-            daemon=True
-        )
-        thread.start()
-
-    def _start_loading(self):
-        """Show loading indicator and disable UI"""
-        self.run_btn.config(state="disabled", text="Processing...")
-        self.loading_label.pack(side="left")
-        self.write_output("🔄 Processing model...")
-        self.update()  # Force GUI update
-
-    def _stop_loading(self):
-        """Hide loading indicator and re-enable UI"""
-        self.run_btn.config(state="normal", text="Run Model")
-        self.loading_label.pack_forget()
-
-    def _process_model_async(self, model_name, input_data):
-        """Process model in background thread"""
         try:
-            # Get or create model instance
-            if model_name not in self._instances:
-                _, model_class = MODEL_CHOICES[model_name]
-                self._instances[model_name] = model_class()
+            job = self._jobs.submit(
+                self._run_job, model_name, input_data, document, name=model_name
+            )
+        except JobQueueFull:
+            self.write_output(f"❌ ERROR: Too many queued jobs (limit {JOB_QUEUE_SIZE}).")
+            return
+        self._watched_jobs.append(job)
+        self.write_output(f"🔄 Job #{job.id} queued ({model_name})")
+        self._update_job_status()
+
+    def _run_job(self, model_name, input_data, document=False):
+        """Runs on a job worker thread; returns (result, runtime). No Tk calls here."""
+        t0 = time.perf_counter()
+        # Lease the model so it is not evicted mid-run; process() waits for an in-flight prewarm
+        with request_context(f"job-{current_job().id}"), \
+                self._registry.lease(model_name, self._model_factory(model_name)) as model:
+            check_cancelled()  # the lease may have waited on a long prewarm
+            if document:
+                # polls for cancellation between token windows
+                result = model.process_document(input_data, from_file=True)
+                result = self._summarize_document(result)
+            else:
+                result = model.process(input_data)
+        return result, time.perf_counter() - t0
+
+    def scan_folder(self):
+        """Classify new/changed images under a folder into the results store."""
+        from tkinter import filedialog
 
-            model = self._instances[model_name]
-            result = model.process(input_data)
+        folder = filedialog.askdirectory(title="Folder to scan")
+        if not folder:
+            return
+        try:
+            job = self._jobs.submit(self._run_scan_job, folder, name="Folder scan",
+                                    timeout=LONG_JOB_TIMEOUT_S)
+        except JobQueueFull:
+            self.write_output(f"❌ ERROR: Too many queued jobs (limit {JOB_QUEUE_SIZE}).")
+            return
+        self._watched_jobs.append(job)
+        self.write_output(f"🔄 Job #{job.id} queued (scan {folder})")
+        self._update_job_status()
+
+    def _run_scan_job(self, folder):
+        """Runs on a job worker thread; stops between batches when cancelled."""
+        from models.folder_scan import FolderScanner, ScanStore
+
+        t0 = time.perf_counter()
+        job = current_job()
+        name = "Image Classification"
+        store = ScanStore()
+        try:
+            with request_context(f"job-{job.id}"), \
+                    self._registry.lease(name, self._model_factory(name)) as model:
+                scanner = FolderScanner(model, store)
+                counts = scanner.scan(folder, should_stop=lambda: job.cancelled)
+                counts["top_labels"] = dict(list(store.label_counts(scanner.key, root=folder).items())[:5])
+        finally:
+            store.close()
+        return counts, time.perf_counter() - t0
+
+    def classify_file_lines(self):
+        """Score every line of a text file in the background, writing results as it goes."""
+        from tkinter import filedialog
+        import os
 
-            # Use after() to safely update GUI from thread
-            self.after(0, self._display_result, model_name, result, model)
+        in_path = filedialog.askopenfilename(
+            title="Classify File Line by Line",
+            filetypes=[("Text files", "*.txt *.log"), ("All files", "*.*")],
+        )
+        if not in_path:
+            return
+        out_path = filedialog.asksaveasfilename(
+            title="Save Per-Line Results",
+            initialfile=os.path.basename(in_path) + ".sentiment.jsonl",
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("CSV", "*.csv")],
+        )
+        if not out_path:
+            return
+        try:
+            job = self._jobs.submit(self._run_lines_job, in_path, out_path,
+                                    name="Line-by-line", timeout=LONG_JOB_TIMEOUT_S)
+        except JobQueueFull:
+            self.write_output(f"❌ ERROR: Too many queued jobs (limit {JOB_QUEUE_SIZE}).")
+            return
+        self._watched_jobs.append(job)
+        self.write_output(f"🔄 Job #{job.id} queued (line by line: {in_path} -> {out_path})")
+        self._update_job_status()
+
+    @staticmethod
+    def _iter_line_chunks(f, size):
+        """Yield lists of (line_no, text, raw_bytes) from a binary file; blank lines skipped."""
+        chunk = []
+        for line_no, raw in enumerate(f, 1):
+            text = raw.decode("utf-8", errors="replace").strip()
+            if text:
+                chunk.append((line_no, text, len(raw)))
+            else:
+                chunk.append((line_no, None, len(raw)))
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _run_lines_job(self, in_path, out_path):
+        """Runs on a job worker thread: stream lines through the text model in batches.
+
+        Progress goes to self._bulk_progress for the main thread to display;
+        on cancel the lines written so far are kept.
+        """
+        from cli.classify import ResultWriter
+        import os
 
-        except Exception as e:
-            # Use after() to safely update GUI from thread
-            self.after(0, self._display_error, str(e))
+        t0 = time.perf_counter()
+        job = current_job()
+        name = "Text-to-Sentiment"
+        labels = Counter()
+        progress = {"lines": 0, "errors": 0, "bytes": 0, "size": max(1, os.path.getsize(in_path)),
+                    "labels": Counter(), "started": t0}
+        self._bulk_progress[job.id] = progress
+        writer = ResultWriter(out_path, "text", append=False)
+        next_sample = t0
+        try:
+            with request_context(f"job-{job.id}"), \
+                    self._registry.lease(name, self._model_factory(name)) as model, \
+                    open(in_path, "rb") as f:
+                for chunk in self._iter_line_chunks(f, BULK_CHUNK_LINES):
+                    if job.cancelled:
+                        break
+                    rows = [(n, text) for n, text, _ in chunk if text is not None]
+                    classified = process_batch_isolated(model, [text for _, text in rows])
+                    last = None
+                    for (n, text), (result, error) in zip(rows, classified):
+                        writer.write({"line": n, "text": text}, result, error)
+                        if error is None:
+                            labels[result["label"]] += 1
+                            last = (n, text, result)
+                        else:
+                            progress["errors"] += 1
+                    writer.flush()
+                    # a fresh copy each time: the main thread iterates it while we keep counting
+                    progress["labels"] = labels.copy()
+                    progress["lines"] += len(chunk)
+                    progress["bytes"] += sum(nbytes for _, _, nbytes in chunk)
+
+                    now = time.perf_counter()
+                    if last is not None and now >= next_sample:
+                        n, text, result = last
+                        self.write_output(
+                            f"   line {n}: {result['label']} {result['score']:.3f}  {text[:60]!r}"
+                        )
+                        next_sample = now + BULK_SAMPLE_S
+        finally:
+            writer.close()
+            self._bulk_progress.pop(job.id, None)
+        if job.cancelled:
+            self.write_output(f"Job #{job.id}: {progress['lines']:,} lines done, kept in {out_path}")
+        summary = {"lines": progress["lines"], "errors": progress["errors"],
+                   "labels": dict(labels.most_common()), "output": out_path,
+                   "cancelled": job.cancelled}
+        return summary, time.perf_counter() - t0
+
+    def _show_bulk_progress(self):
+        """Main thread: one status line per running line-by-line job."""
+        lines = []
+        for job_id, p in list(self._bulk_progress.items()):
+            elapsed = max(1e-6, time.perf_counter() - p["started"])
+            rate = p["lines"] / elapsed
+            done = p["bytes"] / p["size"]
+            eta = (elapsed / done - elapsed) if done > 0 else 0
+            total = sum(p["labels"].values()) or 1
+            mix = "  ".join(f"{k} {v / total:.0%}" for k, v in p["labels"].most_common(3))
+            lines.append(
+                f"Job #{job_id}: {p['lines']:,} lines ({done:.0%}), {rate:,.0f} lines/s, "
+                f"ETA {int(eta // 60)}m{int(eta % 60):02d}s  {mix}"
+            )
+        if lines:
+            self.progress_label.config(text="\n".join(lines))
+            self.progress_label.pack(anchor="w")
+        else:
+            self.progress_label.pack_forget()
 
-    def _display_result(self, model_name, result, model):
-        """Display successful result and stop loading"""
+    def _poll_jobs(self):
+        """Main-thread loop: show finished jobs and refresh the status indicator."""
+        try:
+            for job in [j for j in self._prewarm_jobs if j.finished]:
+                self._prewarm_jobs.remove(job)
+                self._jobs.forget(job.id)
+                self._show_model_status()
+            for job in [j for j in self._watched_jobs if j.finished]:
+                self._watched_jobs.remove(job)
+                self._bulk_progress.pop(job.id, None)
+                self._jobs.forget(job.id)
+                if job.status == DONE:
+                    result, runtime = job.result
+                    self._display_result(job.name, result, runtime)
+                elif job.status == CANCELLED:
+                    self.write_output(f"⛔ Job #{job.id} cancelled.")
+                elif job.status == TIMED_OUT:
+                    self._display_error(f"Job #{job.id} timed out after {job.timeout}s")
+                else:
+                    self._display_error(str(job.error))
+            self._show_bulk_progress()
+            self._update_job_status()
+        finally:
+            # one bad result must not stop the loop that reports every later job
+            self.after(JOB_POLL_MS, self._poll_jobs)
+
+    def _update_job_status(self):
+        """Show running/queued job counts instead of a single busy toggle."""
+        counts = self._jobs.counts()
+        if counts["running"] or counts["queued"]:
+            text = f"🔄 {counts['running']} running, {counts['queued']} queued"
+            if counts["stopping"]:
+                text += f" ({counts['stopping']} stopping)"
+            self.loading_label.config(text=text)
+            self.loading_label.pack(side="left")
+            self.cancel_btn.config(state="normal")
+        else:
+            self.loading_label.pack_forget()
+            self.cancel_btn.config(state="disabled")
+
+    def cancel_jobs(self):
+        """Cancel every queued and running job; running results are discarded."""
+        n = self._jobs.cancel_all()
+        self.write_output(f"Cancelling {n} job(s)...")
+        self._update_job_status()
+
+    @staticmethod
+    def _summarize_document(result, max_chunks=5):
+        """Keep the output readable: document label plus the first few chunk scores."""
+        summary = {k: v for k, v in result.items() if k != "chunks"}
+        summary["first_chunks"] = [
+            {"tokens": f"{c['start_token']}-{c['end_token']}", "label": c["label"],
+             "score": round(c["score"], 4)}
+            for c in result["chunks"][:max_chunks]
+        ]
+        return summary
+
+    def _display_result(self, model_name, result, runtime):
+        """Display successful result"""
         self.write_output(f"✅ ({model_name}) Result:")
         self.write_output(f"{result}")
-
-        rt = getattr(model.process, "last_runtime_s", None)
-        if rt is not None:
-            self.write_output(f"⏱️ Runtime: {rt:.3f}s")
-        
-        self._stop_loading()
+        self.write_output(f"⏱️ Runtime: {runtime:.3f}s")
 
     def _display_error(self, error_msg):
-        """Display error and stop loading"""
+        """Display error"""
         self.write_output(f"❌ ERROR: {error_msg}")
-        self._stop_loading()
 
     def write_output(self, text):
-        self.output_text.config(state="normal")
-        self.output_text.insert("end", text + "\n")
-        self.output_text.config(state="disabled")
-        self.output_text.see("end")
+        # safe from any thread; the view redraws on its own frame timer
+        self.output_log.append(text)
 
     def clear_output(self):
-        self.output_text.config(state="normal")
-        self.output_text.delete("1.0", "end")
-        self.output_text.config(state="disabled")
+        self.output_view.clear()
 
     # File Menu Methods
     def new_session(self):
         self.clear_output()
         self.text_input.delete("1.0", "end")
+        self._document_path = self._document_preview = None
         self.image_path.set("")
         self.selected_file_label.config(text="No file selected")
         self.write_output("New session started.")
@@ -470,8 +829,18 @@ class App(tk.Tk):
         )
         if file_path:
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
+                import os
+
+                self._document_path = self._document_preview = None
+                if os.path.getsize(file_path) > LARGE_FILE_BYTES:
+                    # too big for the widget: show a preview, score the file from disk
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        content = f.read(4000).strip()
+                    self._document_path, self._document_preview = file_path, content
+                    self.write_output("Large file: showing a preview; Run Model scores the whole document.")
+                else:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        content = f.read()
                 self.text_input.delete("1.0", "end")
                 self.text_input.insert("1.0", content)
 
@@ -493,9 +862,7 @@ class App(tk.Tk):
         )
         if file_path:
             try:
-                content = self.output_text.get("1.0", "end-1c")
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(content)
+                self.output_log.save(file_path)
                 self.write_output(f"Output saved to: {file_path}")
             except Exception as e:
                 self.write_output(f"Error saving file: {e}")
@@ -521,27 +888,56 @@ class App(tk.Tk):
             info += "Model: google/vit-base-patch16-224\n"
             info += "Task: Image Classification\n"
             info += "Type: Vision Transformer"
+
+        info += "\n\nResident Models:\n"
+        resident = self._registry.resident()
+        for row in resident:
+            mb = row["memory_bytes"] / (1024 * 1024)
+            info += f"• {row['name']}: {row['status']}, {mb:.0f} MB\n"
+        if not resident:
+            info += "• None"
         messagebox.showinfo("Model Information", info)
 
     def show_performance_stats(self):
         from tkinter import messagebox
 
-        stats = "Performance Statistics:\n\n"
-        stats += "• Average inference time\n"
-        stats += "• Memory usage\n"
-        stats += "• Accuracy metrics\n"
-        stats += "• Model load times"
+        stats = "Performance Statistics:\n"
+        snapshot = get_metrics().snapshot()
+        for model_id, stages in snapshot.items():
+            stats += f"\n{model_id}\n"
+            for stage, s in stages.items():
+                line = f"• {stage}: n={s['count']}, p50 {s['p50_ms']:.1f} ms, "
+                line += f"p95 {s['p95_ms']:.1f} ms, p99 {s['p99_ms']:.1f} ms"
+                if s["items_per_busy_s"] and s["items"] > s["count"]:
+                    line += f", {s['items_per_busy_s']:.1f} items/s"
+                stats += line + "\n"
+        if not snapshot:
+            stats += "\nNo measurements yet - run a model first."
+
+        resident = self._registry.resident()
+        if resident:
+            stats += "\nMemory:\n"
+        for row in resident:
+            stats += f"• {row['name']}: {row['memory_bytes'] / (1024 * 1024):.0f} MB\n"
         messagebox.showinfo("Performance Stats", stats)
 
     def clear_model_cache(self):
-        self._instances.clear()
-        self.write_output("Model cache cleared.")
+        self._registry.clear()
+        cache = get_default_cache()
+        stats = cache.stats()
+        cache.clear()
+        self.write_output(
+            f"Model cache cleared ({stats['entries']} cached results, "
+            f"{stats['hits']} hits / {stats['misses']} misses)."
+        )
+        self._show_model_status()
 
     def reload_current_model(self):
         current_model = self.model_var.get()
-        if current_model in self._instances:
-            del self._instances[current_model]
+        # weights stay in the process-wide cache, so this is instant
+        self._registry.reload(current_model)
         self.load_model()
+        self._prewarm(current_model)
 
     # Help Menu Methods
     def show_quick_start(self):
@@ -1,4 +1,8 @@
+import shutil
+import tempfile
+import threading
 import tkinter as tk
+from collections import deque
 from tkinter import filedialog, scrolledtext
 
 class LabeledText(tk.Frame):
@@ -42,3 +46,195 @@ class OutputBox(scrolledtext.ScrolledText):
         self.insert("end", text + "\n")
         self.config(state="disabled")
         self.see("end")
+
+
+class OutputLog:
+    """Thread-safe output record log: a bounded ring buffer for display plus
+    a disk spool holding every record, so memory stays flat however much a
+    batch job prints. Any thread may append; views poll `version`.
+    """
+
+    def __init__(self, capacity=5000, spool=True):
+        self._lines = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._spool = tempfile.TemporaryFile("w+", encoding="utf-8") if spool else None
+        self.total = 0  # records ever appended (since the last clear)
+        self.version = 0
+
+    def append(self, text: str):
+        lines = str(text).split("\n")
+        with self._lock:
+            self._lines.extend(lines)
+            if self._spool is not None:
+                self._spool.write("\n".join(lines) + "\n")
+            self.total += len(lines)
+            self.version += 1
+
+    def __len__(self):
+        return len(self._lines)
+
+    @property
+    def dropped(self):
+        """Records that fell out of the ring buffer (still in the spool)."""
+        return self.total - len(self._lines)
+
+    def span(self):
+        """(first, stop): record numbers still held in the ring buffer."""
+        with self._lock:
+            return self.total - len(self._lines), self.total
+
+    def slice(self, start, stop):
+        """Records start..stop-1, numbered from the last clear; dropped ones are skipped."""
+        with self._lock:
+            base = self.total - len(self._lines)
+            start, stop = max(base, start), min(self.total, stop)
+            return [self._lines[i - base] for i in range(start, stop)]
+
+    def save(self, path):
+        """Stream every record since the last clear to path."""
+        with self._lock:
+            if self._spool is None:
+                data = "\n".join(self._lines) + ("\n" if self._lines else "")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                return
+            self._spool.flush()
+            self._spool.seek(0)
+            with open(path, "w", encoding="utf-8") as f:
+                shutil.copyfileobj(self._spool, f)
+            self._spool.seek(0, 2)
+
+    def clear(self):
+        with self._lock:
+            self._lines.clear()
+            if self._spool is not None:
+                self._spool.seek(0)
+                self._spool.truncate()
+            self.total = 0
+            self.version += 1
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+
+class VirtualOutputView(tk.Frame):
+    """Read-only view of an OutputLog that renders only the visible rows.
+
+    Refreshes at most `fps` times a second, and only when the log or the
+    scroll position changed, so thousands of appends cost one redraw.
+    Sticks to the newest records unless the user scrolls up; the scroll
+    position is an absolute record number, so the view stays put while the
+    ring buffer drops old records, and a text selection survives redraws.
+    """
+
+    def __init__(self, master, log: OutputLog, fps=20, **kw):
+        text_kw = {k: kw.pop(k) for k in ("height", "width") if k in kw}
+        super().__init__(master, **kw)
+        self.log = log
+        self.interval_ms = max(1, 1000 // fps)
+        self.text = tk.Text(self, state="disabled", wrap="word", **text_kw)
+        self.scrollbar = tk.Scrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text.pack(side="left", fill="both", expand=True)
+        self._first = 0  # record number of the top row
+        self._shown = 0  # record number at text line 1 in the last redraw
+        self._follow = True
+        self._rendered = None
+        self._linespace = None
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(seq, self._on_wheel)
+        self.after(self.interval_ms, self._tick)
+
+    def _rows(self):
+        if self._linespace is None:
+            from tkinter import font as tkfont
+            self._linespace = max(1, tkfont.Font(font=self.text.cget("font")).metrics("linespace"))
+        return max(1, self.text.winfo_height() // self._linespace)
+
+    def _scroll_to(self, first):
+        rows = self._rows()
+        start, stop = self.log.span()
+        last_first = max(start, stop - rows)
+        self._first = min(max(start, int(first)), last_first)
+        self._follow = self._first >= last_first
+
+    def _on_scrollbar(self, *args):
+        start, stop = self.log.span()
+        if args[0] == "moveto":
+            self._scroll_to(start + float(args[1]) * max(1, stop - start))
+        elif args[0] == "scroll":
+            step = self._rows() if args[2] == "pages" else 1
+            self._scroll_to(self._first + int(args[1]) * step)
+        self._render()
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self._first - 3)
+        else:
+            self._scroll_to(self._first + 3)
+        self._render()
+        return "break"
+
+    def _tick(self):
+        try:
+            self._render()
+        finally:
+            self.after(self.interval_ms, self._tick)
+
+    def _render(self):
+        rows = self._rows()
+        start, stop = self.log.span()
+        if self._follow:
+            self._first = max(start, stop - rows)
+        # once the top record drops out of the buffer, show the oldest one kept
+        self._first = min(max(self._first, start), max(start, stop - 1))
+        key = (self.log.version, self._first, rows)
+        if key == self._rendered:
+            return
+        self._rendered = key
+        selection = self._saved_selection()
+        lines = self.log.slice(self._first, self._first + rows)
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", "\n".join(lines))
+        self.text.config(state="disabled")
+        self._shown = self._first
+        self._restore_selection(selection, len(lines))
+        if self._follow:
+            self.text.see("end")  # wrapped lines may overflow the visible rows
+        kept = stop - start
+        if kept:
+            top = (self._first - start) / kept
+            self.scrollbar.set(top, min(1.0, top + rows / kept))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _saved_selection(self):
+        """Current selection as ((record, col), (record, col)), or None."""
+        ranges = self.text.tag_ranges("sel")
+        if not ranges:
+            return None
+        out = []
+        for index in (ranges[0], ranges[1]):
+            line, col = map(int, str(index).split("."))
+            out.append((self._shown + line - 1, col))
+        return out
+
+    def _restore_selection(self, selection, n_lines):
+        if selection is None or not n_lines:
+            return
+        (r0, c0), (r1, c1) = selection
+        last = self._first + n_lines - 1
+        if r1 < self._first or r0 > last:
+            return  # scrolled out of view
+        # clip to the rows on screen; the clipped end runs to the edge of the view
+        head = f"{r0 - self._first + 1}.{c0}" if r0 >= self._first else "1.0"
+        tail = f"{r1 - self._first + 1}.{c1}" if r1 <= last else "end"
+        self.text.tag_add("sel", head, tail)
+
+    def clear(self):
+        self.log.clear()
+        self._first = self._shown = 0
+        self._follow = True
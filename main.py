@@ -1,5 +1,12 @@
-from gui.app_gui import App
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # headless subcommands; never imports tkinter
+        from cli.commands import main
+        sys.exit(main(sys.argv[1:]))
+
+    from gui.app_gui import App
+
     app = App()
     app.mainloop()
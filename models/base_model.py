@@ -1,26 +1,169 @@
+import threading
 from abc import ABC, abstractmethod
-from transformers import pipeline
+from models.cache import ResultCache, get_default_cache
+from utils.metrics import get_metrics, instrument_pipeline
+from utils.log import get_logger
+
+_logger = get_logger("MODEL")
 
 class BaseAIModel(ABC):
+    # batch size when a call passes none: an explicit set_config(default_batch_size=...)
+    # wins, then the autotuned value (models.tuning), then fallback_batch_size
+    fallback_batch_size = 8
+    tuned_batch_size = None
+    _explicit_batch_size = None
+    preprocess_stage = "preprocess"  # metrics name for the pipeline's preprocess step
+
+    # micro-batching knobs, tunable through ConfigMixin.set_config
+    micro_batching = False
+    max_batch_size = 16
+    max_wait_ms = 5
+    max_queue_size = 0  # 0 = unbounded
+
+    # "fp32", "bf16" (autocast) or "int8" (dynamic quantization); see models.precision
+    precision = "fp32"
+
+    # per-host threads/batch size saved by "main.py autotune"; see models.tuning
+    use_runtime_profile = True
+
+    # result memoization; None means the shared models.cache default
+    use_result_cache = True
+    result_cache = None
+
     def __init__(self, model_id: str, task_name: str):
         self._model_id = model_id  # encapsulated detail
         self._task_name = task_name
         self._pipeline = None  # lazy load
+        self._loaded_precision = None
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.status = "idle"  # idle -> loading -> loaded -> ready (or error)
 
     @property
     def model_id(self):
         # controlled access
         return self._model_id
 
+    @property
+    def default_batch_size(self):
+        return self._explicit_batch_size or self.tuned_batch_size or self.fallback_batch_size
+
+    @default_batch_size.setter
+    def default_batch_size(self, value):
+        self._explicit_batch_size = value
+
+    @property
+    def task_name(self):
+        return self._task_name
+
+    @property
+    def is_loaded(self):
+        return self._pipeline is not None and self._loaded_precision == self.precision
+
     def load(self):
-        """Load pipeline once. Overridable if needed."""
-        if self._pipeline is None:
-            print(f"Loading model: {self._model_id}...")
-            self._pipeline = pipeline(self._task_name, model=self._model_id)
-            print("Model loaded.")
+        """Load pipeline once (again if precision changed). Overridable if needed."""
+        precision = self.precision
+        if self._pipeline is not None and self._loaded_precision == precision:
+            return self._pipeline
+        # single-flight: a second caller waits for the in-flight load
+        with self._load_lock:
+            if self._pipeline is None or self._loaded_precision != precision:
+                # deferred so importing the models package never pulls in torch
+                from models.precision import load_pipeline
+                from models.registry import get_weight_cache
+                from models.tuning import apply_profile
+
+                if self.use_runtime_profile:
+                    apply_profile(self)
+                self.status = "loading"
+                _logger.info(f"Loading model: {self._model_id} ({precision})...")
+                try:
+                    # weights are shared process-wide, so a rebuilt instance loads instantly
+                    with get_metrics().time(self._model_id, "load"):
+                        self._pipeline = get_weight_cache().get_or_load(
+                            self._model_id, self._task_name,
+                            lambda: instrument_pipeline(
+                                load_pipeline(self._task_name, self._model_id, precision),
+                                self._model_id, self.preprocess_stage,
+                            ),
+                            variant=precision,
+                        )
+                except Exception:
+                    self.status = "error"
+                    raise
+                self._loaded_precision = precision
+                self.status = "loaded"
+                _logger.info("Model loaded.", model_id=self._model_id)
         return self._pipeline
 
+    def warmup(self):
+        """Load the pipeline and run one synthetic input so the first real call is warm."""
+        pipe = self.load()
+        if self.status != "ready":
+            self._warmup(pipe)
+            self.status = "ready"
+        return self
+
+    def close(self):
+        """Release the pipeline reference and stop the batcher thread."""
+        with self._batcher_lock:
+            if self._batcher is not None:
+                self._batcher.close(wait=False)
+                self._batcher = None
+        self._pipeline = None
+        self._loaded_precision = None
+        self.status = "idle"
+
+    def _warmup(self, pipe):
+        """Run a throwaway inference; subclasses supply a representative input."""
+        pass
+
+    def get_batcher(self):
+        """Shared MicroBatcher that coalesces concurrent process() calls."""
+        with self._batcher_lock:
+            if self._batcher is None:
+                from models.batching import MicroBatcher
+                self._batcher = MicroBatcher(self, run_batch=self._run_batch)
+            return self._batcher
+
+    def _with_cache(self, inputs, compute):
+        """Serve inputs from the result cache; compute() only sees the misses."""
+        if not self.use_result_cache:
+            return compute(inputs)
+        cache = self.result_cache or get_default_cache()
+
+        # reduced precision can shift scores, so each mode gets its own entries
+        task = self._task_name if self.precision == "fp32" else f"{self._task_name}@{self.precision}"
+        keys = [ResultCache.make_key(self._model_id, task, self._cache_key(x)) for x in inputs]
+        results = [cache.get(k) for k in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            fresh = compute([inputs[i] for i in missing])
+            for i, res in zip(missing, fresh):
+                results[i] = res
+            cache.put_many((keys[i], results[i]) for i in missing if self._cacheable(results[i]))
+        return results
+
+    def _cache_key(self, input_data) -> str:
+        """Content digest of one input; subclasses hash text or image bytes."""
+        raise NotImplementedError
+
+    def _cacheable(self, result) -> bool:
+        """Whether a result is small enough to keep in the result cache."""
+        return True
+
     @abstractmethod
     def process(self, input_data):
         """Polymorphic interface: all subclasses must implement."""
         pass
+
+    @abstractmethod
+    def process_batch(self, inputs, batch_size=None):
+        """Batched version of process(); results come back in input order."""
+        pass
+
+    @abstractmethod
+    def _run_batch(self, inputs, batch_size=None):
+        """Uncached forward pass over a list of inputs (used by the batcher)."""
+        pass
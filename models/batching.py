@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from utils.log import current_request_id, request_context
+
+
+def process_batch_isolated(model, inputs, batch_size=None, runner=None):
+    """[(result, error)] per input; if the batch fails, each input is retried
+    alone through model.process() so one bad input doesn't fail the rest.
+
+    runner (e.g. a ForkedWorkerPool) runs the batch in place of the model.
+    """
+    try:
+        return [(r, None) for r in (runner or model).process_batch(inputs, batch_size=batch_size)]
+    except Exception:
+        out = []
+        for x in inputs:
+            try:
+                out.append((model.process(x), None))
+            except Exception as e:
+                out.append((None, str(e)))
+        return out
+
+
+class QueueFullError(RuntimeError):
+    """Raised by MicroBatcher.submit() when the request queue is at capacity."""
+    pass
+
+
+class MicroBatcher:
+    """Per-model request queue that turns concurrent process(x) calls into batches.
+
+    Requests are collected for up to ``model.max_wait_ms`` or until
+    ``model.max_batch_size`` are waiting, then run through ``process_batch``
+    in one go. Limits are read from the model on every batch, so
+    ``set_config(max_batch_size=..., max_wait_ms=...)`` applies immediately.
+    Log records from a batch carry the request IDs of every caller in it.
+    """
+
+    def __init__(self, model, run_batch=None):
+        self._model = model
+        self._run_batch = run_batch or model.process_batch
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._loop, name=f"batcher-{model.model_id}", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def queue_depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def submit(self, input_data) -> Future:
+        """Queue one request; the returned future resolves to its result."""
+        fut = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            limit = getattr(self._model, "max_queue_size", 0)
+            if limit and len(self._pending) >= limit:
+                # requests cancelled while queued (e.g. a rejected batch) don't hold slots
+                self._pending = deque(p for p in self._pending if not p[1].cancelled())
+            if limit and len(self._pending) >= limit:
+                raise QueueFullError(f"{len(self._pending)} requests already queued")
+            self._pending.append((input_data, fut, current_request_id()))
+            self._cond.notify()
+        return fut
+
+    def close(self, wait=True):
+        """Stop accepting requests; queued ones are still processed."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            self._thread.join()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None  # closed and drained
+
+            max_batch = max(1, int(self._model.max_batch_size))
+            deadline = time.monotonic() + self._model.max_wait_ms / 1000.0
+            while len(self._pending) < max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            n = min(max_batch, len(self._pending))
+            return [self._pending.popleft() for _ in range(n)]
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            # drop requests whose caller cancelled while they were queued
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if batch:
+                self._run(batch)
+
+    def _run(self, batch):
+        rids = list(dict.fromkeys(rid for _, _, rid in batch if rid))
+        if not rids:
+            return self._execute(batch)
+        with request_context(",".join(rids)):
+            return self._execute(batch)
+
+    def _execute(self, batch):
+        inputs = [x for x, _, _ in batch]
+        try:
+            results = self._run_batch(inputs, batch_size=len(inputs))
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # one bad input should not fail everyone else in the batch
+            for item in batch:
+                self._run([item])
+            return
+        for (_, fut, _), res in zip(batch, results):
+            fut.set_result(res)
@@ -0,0 +1,144 @@
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def cache_dir(*parts) -> str:
+    """Directory for on-disk model artifacts (MODEL_CACHE_DIR or ~/.cache/hit137-ai-gui)."""
+    root = os.environ.get("MODEL_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "hit137-ai-gui"
+    )
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def text_digest(text: str) -> str:
+    """Hash of the normalized text (unicode NFC, surrounding whitespace stripped)."""
+    norm = unicodedata.normalize("NFC", text.strip())
+    return hashlib.sha256(norm.encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hash of the raw file bytes, so renamed copies of an image still hit."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Content-addressed result cache: in-memory LRU plus optional SQLite tier.
+
+    Keys are built by make_key(model_id, task, digest). Values must be
+    JSON-serializable (the normalized model outputs are).
+    """
+
+    def __init__(self, max_entries: int = 4096, db_path: str = None):
+        self.max_entries = max_entries
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if db_path:
+            self.attach_disk(db_path)
+
+    @staticmethod
+    def make_key(model_id: str, task: str, digest: str) -> str:
+        return f"{model_id}|{task}|{digest}"
+
+    def attach_disk(self, db_path: str):
+        """Enable the persistent tier; entries survive restarts."""
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._lock:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._mem[key])
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return copy.deepcopy(value)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value):
+        self.put_many([(key, value)])
+
+    def put_many(self, items):
+        """Store (key, value) pairs; the disk tier writes them in one transaction."""
+        items = list(items)
+        with self._lock:
+            for key, value in items:
+                self._remember(key, copy.deepcopy(value))
+            if self._db is not None and items:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in items],
+                )
+                self._db.commit()
+
+    def _remember(self, key, value):
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def clear(self, disk: bool = True):
+        """Drop all cached results (and the on-disk tier unless disk=False)."""
+        with self._lock:
+            self._mem.clear()
+            if disk and self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+            self.hits = self.misses = self.disk_hits = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._mem),
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / total if total else 0.0,
+                "persistent": self._db is not None,
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> ResultCache:
+    """Process-wide cache shared by all models.
+
+    Set RESULT_CACHE_DB to a file path to turn on the persistent tier.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache(db_path=os.environ.get("RESULT_CACHE_DB"))
+        return _default_cache
@@ -0,0 +1,161 @@
+import threading
+
+from utils.log import get_logger
+from utils.metrics import get_metrics
+
+_logger = get_logger("CASCADE")
+
+
+def confidence(result) -> float:
+    """Top-1 score of a normalized result (text dict, or image top-k list)."""
+    if isinstance(result, list):
+        return result[0]["score"] if result else 0.0
+    return result["score"]
+
+
+def top_label(result):
+    if isinstance(result, list):
+        return result[0]["label"] if result else None
+    return result["label"]
+
+
+class ConfidenceCascade:
+    """Two-stage classifier: a cheap first model answers when it is confident.
+
+    Every input goes through `first`; those whose top-1 score is below
+    `threshold` are re-run on `full` and get its answer. Both stages must
+    share a label set (a quantized or smaller checkpoint of the same task);
+    load() checks their id2label and raises ValueError if they differ.
+    Pick the threshold with calibrate(). Per-stage timings are recorded
+    under the full model's id as "cascade.first" / "cascade.full", whose
+    item counts give the hit rate; stats() reports it directly.
+    """
+
+    def __init__(self, first, full, threshold: float = 0.9):
+        self.first = first
+        self.full = full
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.inputs = 0
+        self.escalated = 0
+        self._labels_checked = False
+
+    @property
+    def model_id(self):
+        return self.full.model_id
+
+    def load(self):
+        # full first: an int8 first stage whose cache is cold quantizes the resident
+        # fp32 weights instead of reading them from disk a second time
+        full = self.full.load()
+        first = self.first.load()
+        if not self._labels_checked:
+            a, b = first.model.config.id2label, full.model.config.id2label
+            if a != b:
+                raise ValueError(f"Cascade stages disagree on labels: {self.first.model_id} has "
+                                 f"{sorted(a.values())}, {self.full.model_id} has "
+                                 f"{sorted(b.values())}")
+            self._labels_checked = True
+        return self
+
+    def warmup(self):
+        self.load()
+        self.first.warmup()
+        self.full.warmup()
+        return self
+
+    def process(self, input_data):
+        return self.process_batch([input_data])[0]
+
+    def process_batch(self, inputs, batch_size=None):
+        inputs = list(inputs)
+        if not inputs:
+            return []
+        if not self._labels_checked:
+            self.load()
+        metrics = get_metrics()
+        with metrics.time(self.model_id, "cascade.first", items=len(inputs)):
+            results = self.first.process_batch(inputs, batch_size=batch_size)
+        unsure = [i for i, r in enumerate(results) if confidence(r) < self.threshold]
+        if unsure:
+            with metrics.time(self.model_id, "cascade.full", items=len(unsure)):
+                second = self.full.process_batch([inputs[i] for i in unsure],
+                                                 batch_size=batch_size)
+            for i, r in zip(unsure, second):
+                results[i] = r
+        with self._lock:
+            self.inputs += len(inputs)
+            self.escalated += len(unsure)
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            n, up = self.inputs, self.escalated
+        return {
+            "threshold": self.threshold,
+            "inputs": n,
+            "first_stage": n - up,
+            "escalated": up,
+            "first_stage_hit_rate": (n - up) / n if n else None,
+        }
+
+    def close(self):
+        self.first.close()
+        self.full.close()
+
+
+def build_cascade(full, first_model_id: str = None, first_precision: str = "int8",
+                  threshold: float = 0.9) -> ConfidenceCascade:
+    """Cascade in front of `full`; by default the first stage is its int8 copy.
+
+    Once quantized (first run), that copy starts from the int8 cache without
+    reading fp32 weights (see models.precision).
+
+    first_model_id swaps in a smaller checkpoint of the same task instead.
+    """
+    first = type(full)(first_model_id or full.model_id)
+    first.set_config(precision=first_precision)
+    for attr in ("use_result_cache", "top_k"):
+        if hasattr(full, attr):
+            setattr(first, attr, getattr(full, attr))
+    return ConfidenceCascade(first, full, threshold)
+
+
+def calibrate(first_results, full_results, target_agreement: float = 0.99, truth=None) -> dict:
+    """Lowest threshold whose cascade output agrees with `full` on target_agreement
+    of the sample, i.e. the most inputs the first stage may answer alone.
+
+    Inputs are accepted at the first stage in decreasing confidence; an
+    escalated input always agrees. With `truth` (gold labels) the accuracy of
+    the cascade and of the full model are reported too.
+    """
+    n = len(first_results)
+    if n == 0 or n != len(full_results):
+        raise ValueError("Need equally long, non-empty first/full result lists")
+    conf = [confidence(r) for r in first_results]
+    agree = [top_label(a) == top_label(b) for a, b in zip(first_results, full_results)]
+    order = sorted(range(n), key=lambda i: -conf[i])
+
+    best_m, disagree = 0, 0
+    for m, i in enumerate(order, 1):
+        disagree += not agree[i]
+        # only cut between distinct scores, since the threshold takes all ties
+        tie = m < n and conf[order[m]] == conf[i]
+        if not tie and 1 - disagree / n >= target_agreement:
+            best_m = m
+    # nothing can be accepted: a threshold above any score escalates everything
+    threshold = conf[order[best_m - 1]] if best_m else 1.0 + 1e-9
+    accepted = set(order[:best_m])
+    report = {
+        "threshold": threshold,
+        "target_agreement": target_agreement,
+        "agreement": 1 - sum(not agree[i] for i in accepted) / n,
+        "first_stage_hit_rate": best_m / n,
+        "sample": n,
+    }
+    if truth is not None:
+        cascade = [first_results[i] if i in accepted else full_results[i] for i in range(n)]
+        report["cascade_accuracy"] = sum(top_label(r) == t for r, t in zip(cascade, truth)) / n
+        report["full_accuracy"] = sum(top_label(r) == t for r, t in zip(full_results, truth)) / n
+    _logger.info("Calibrated cascade threshold", **report)
+    return report
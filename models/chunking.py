@@ -0,0 +1,116 @@
+import io
+from collections import deque
+from itertools import islice
+
+CHAR_CHUNK = 64 * 1024
+
+
+def iter_text_pieces(source, chunk_chars: int = CHAR_CHUNK):
+    """Yield a text (str) or text stream (file object) in pieces that end on whitespace.
+
+    Cutting on whitespace keeps words intact across pieces, so tokenizing the
+    pieces separately gives the same tokens as tokenizing the whole text.
+    """
+    stream = io.StringIO(source) if isinstance(source, str) else source
+    carry = ""
+    while True:
+        block = stream.read(chunk_chars)
+        if not block:
+            break
+        block = carry + block
+        cut = max(block.rfind(" "), block.rfind("\n"), block.rfind("\t"))
+        if cut <= 0:
+            if len(block) < 4 * chunk_chars:
+                carry = block  # no whitespace yet; keep reading
+                continue
+            cut = len(block)  # pathological run without spaces: cut anyway
+
+        carry = block[cut:]
+        yield block[:cut]
+    if carry.strip():
+        yield carry
+
+
+def iter_token_windows(tokenizer, source, window: int, overlap: int, chunk_chars: int = CHAR_CHUNK):
+    """Stream overlapping windows of token ids without holding the whole token list.
+
+    Yields (start_token, ids) where ids has at most ``window`` tokens and
+    consecutive windows share ``overlap`` tokens.
+    """
+    if not 0 <= overlap < window:
+        raise ValueError("overlap must be >= 0 and smaller than window")
+    step = window - overlap
+    buf = deque()
+    start = 0
+    emitted = False
+    for piece in iter_text_pieces(source, chunk_chars):
+        buf.extend(tokenizer(piece, add_special_tokens=False)["input_ids"])
+        while len(buf) >= window:
+            yield start, list(islice(buf, window))
+            emitted = True
+            for _ in range(step):
+                buf.popleft()
+            start += step
+    # the tail is only new if it holds tokens not already covered by the last window
+    if buf and (not emitted or len(buf) > overlap):
+        yield start, list(buf)
+
+
+def classify_windows(pipe, windows, batch_size: int):
+    """Run token windows through the pipeline's model in padded batches.
+
+    Yields (start_token, n_tokens, probs) per window, where probs is a list
+    of class probabilities indexed like model.config.id2label.
+    """
+    import torch
+
+    tokenizer = pipe.tokenizer
+    batch = []
+
+    def run(batch):
+        ids = [tokenizer.build_inputs_with_special_tokens(w) for _, w in batch]
+        inputs = tokenizer.pad({"input_ids": ids}, return_tensors="pt")
+        # forward() handles no_grad/device placement and any precision wrapper
+        logits = pipe.forward(dict(inputs))["logits"]
+        probs = torch.softmax(logits.float(), dim=-1).tolist()
+        for (start, w), p in zip(batch, probs):
+            yield start, len(w), p
+
+    for item in windows:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield from run(batch)
+            batch = []
+    if batch:
+        yield from run(batch)
+
+
+def aggregate(window_results, id2label, overlap: int):
+    """Combine per-window probabilities into a document-level prediction.
+
+    Each window is weighted by the tokens it adds beyond the previous
+    window's overlap, so overlapping text is not counted twice.
+    """
+    totals = None
+    weight_sum = 0
+    chunks = []
+    for i, (start, n_tokens, probs) in enumerate(window_results):
+        weight = n_tokens if i == 0 else max(1, n_tokens - overlap)
+        if totals is None:
+            totals = [0.0] * len(probs)
+        for k, p in enumerate(probs):
+            totals[k] += weight * p
+        weight_sum += weight
+        best = max(range(len(probs)), key=probs.__getitem__)
+        chunks.append({
+            "label": id2label[best],
+            "score": float(probs[best]),
+            "start_token": start,
+            "end_token": start + n_tokens,
+        })
+
+    if not chunks:
+        raise ValueError("document contains no tokens")
+    doc = [t / weight_sum for t in totals]
+    best = max(range(len(doc)), key=doc.__getitem__)
+    return {"label": id2label[best], "score": float(doc[best]), "num_chunks": len(chunks), "chunks": chunks}
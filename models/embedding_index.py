@@ -0,0 +1,339 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+DTYPES = ("float32", "float16")
+
+
+class EmbeddingIndex:
+    """Append-only on-disk vector store answering top-k cosine queries.
+
+    Vectors are L2-normalized on insert and kept in a memory-mapped matrix
+    (float32, or float16 at half the size), so cosine similarity is a dot
+    product and only the pages a query touches are read. Adding vectors
+    appends rows in place; a key that is already present is overwritten.
+
+    Brute-force search scans the matrix in blocks. Once the library is large,
+    build_ivf() clusters the vectors (spherical k-means) and search() then
+    only scores rows in the nprobe closest clusters, read from inverted
+    lists. Rows added afterwards are assigned to their nearest cluster on
+    insert and sit in a short unsorted tail until it is folded into the
+    lists, so the index never needs a rebuild to see new images (only to
+    re-balance clusters).
+
+    Layout of directory: meta.json, keys.jsonl (one key per row), vectors.bin,
+    and with IVF ivf_centroids.npy, ivf_assign.bin (int32 cluster per row)
+    and ivf_lists.npy (per-cluster offsets, then the covered rows sorted by
+    cluster).
+    """
+
+    block_rows = 65536  # rows scored per step of a brute-force scan
+    min_capacity = 1024
+    max_ivf_tail = 4096  # unsorted rows past the inverted lists before they are re-sorted
+
+    def __init__(self, directory: str, dim: int = None, dtype: str = "float32"):
+        self.directory = directory
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        meta = self._read_meta()
+        if meta is None:
+            if dim is None:
+                raise ValueError(f"{directory} holds no index; pass dim to create one")
+            if dtype not in DTYPES:
+                raise ValueError(f"Unknown dtype {dtype!r}; expected one of {DTYPES}")
+            meta = {"dim": int(dim), "dtype": dtype, "count": 0, "capacity": 0}
+        elif dim is not None and dim != meta["dim"]:
+            raise ValueError(f"Index dim is {meta['dim']}, got {dim}")
+        self.dim = meta["dim"]
+        self.dtype = np.dtype(meta["dtype"])
+        self._count = meta["count"]
+        self._capacity = meta["capacity"]
+        self._vectors = None
+        self._assign = None
+        self._centroids = None
+        self._offsets = None  # cluster c's rows are _order[_offsets[c]:_offsets[c + 1]]
+        self._order = None
+
+        # meta.json's count is authoritative; drop keys from an interrupted add
+        self._keys = self._read_keys(self._count)
+        self._rows = {k: i for i, k in enumerate(self._keys)}
+        self._map(self._capacity)
+        centroids = self._path("ivf_centroids.npy")
+        if os.path.exists(centroids):
+            self._centroids = np.load(centroids)
+            self._assign = self._map_file("ivf_assign.bin", np.int32, 1, self._capacity)
+            self._read_lists()
+        self._write_meta()
+
+    # storage
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_meta(self):
+        try:
+            with open(self._path("meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self):
+        meta = {"dim": self.dim, "dtype": self.dtype.name, "count": self._count,
+                "capacity": self._capacity}
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path("meta.json"))
+
+    def _read_keys(self, count):
+        """First count keys; a longer (or torn) keys.jsonl is cut back to them on disk,
+        so the next add appends right after row count - 1."""
+        path = self._path("keys.jsonl")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        if len(lines) < count:
+            raise ValueError(f"{path} has {len(lines)} keys, meta.json expects {count}")
+        keys = [json.loads(line) for line in lines[:count]]
+        if len(lines) > count:
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(lines[:count])
+            os.replace(tmp, path)
+        return keys
+
+    def _map_file(self, name, dtype, width, rows):
+        path = self._path(name)
+        size = rows * width * np.dtype(dtype).itemsize
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        if rows == 0:
+            return np.zeros((0, width) if width > 1 else 0, dtype=dtype)
+        shape = (rows, width) if width > 1 else (rows,)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _map(self, capacity):
+        self._vectors = self._map_file("vectors.bin", self.dtype, self.dim, capacity)
+        if self._centroids is not None:
+            self._assign = self._map_file("ivf_assign.bin", np.int32, 1, capacity)
+        self._capacity = capacity
+
+    def _reserve(self, rows):
+        if rows <= self._capacity:
+            return
+        # grow geometrically so appends stay amortized O(1)
+        self._flush()
+        self._map(max(rows, 2 * self._capacity, self.min_capacity))
+
+    def _read_lists(self):
+        n_lists = len(self._centroids)
+        try:
+            lists = np.load(self._path("ivf_lists.npy"), mmap_mode="r")
+        except FileNotFoundError:
+            lists = None
+        # rows past the index's count belong to an add that never committed
+        if lists is None or len(lists) - n_lists - 1 > self._count:
+            self._build_lists()
+            return
+        self._offsets = np.asarray(lists[:n_lists + 1])
+        self._order = lists[n_lists + 1:]
+
+    def _build_lists(self):
+        """Sort every row by cluster and persist offsets + order as one file."""
+        count = self._count
+        assign = np.asarray(self._assign[:count])
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assign[order], np.arange(len(self._centroids) + 1))
+        tmp = self._path("ivf_lists.tmp.npy")
+        np.save(tmp, np.concatenate([offsets.astype(np.int64), order]))
+        os.replace(tmp, self._path("ivf_lists.npy"))
+        self._offsets, self._order = offsets, order
+
+    def _flush(self):
+        for arr in (self._vectors, self._assign):
+            if isinstance(arr, np.memmap):
+                arr.flush()
+
+    # public API
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    @property
+    def keys(self):
+        return list(self._keys)
+
+    @property
+    def has_ivf(self):
+        return self._centroids is not None
+
+    def add(self, keys, vectors):
+        """Insert or overwrite one row per key; vectors is (len(keys), dim)."""
+        vectors = self._normalize(vectors)
+        keys = list(keys)
+        if len(keys) != len(vectors):
+            raise ValueError(f"{len(keys)} keys for {len(vectors)} vectors")
+        with self._lock:
+            rows, new_keys = [], []
+            covered = len(self._order) if self._order is not None else 0
+            for key in keys:
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._count + len(new_keys)
+                    self._rows[key] = row
+                    new_keys.append(key)
+                rows.append(row)
+            self._reserve(self._count + len(new_keys))
+            rows = np.asarray(rows, dtype=np.int64)
+            self._vectors[rows] = vectors.astype(self.dtype, copy=False)
+            moved = False
+            if self._centroids is not None:
+                assign = self._nearest_lists(vectors, 1)[:, 0]
+                sorted_rows = rows < covered
+                # an overwrite that changes a listed row's cluster invalidates the lists
+                moved = bool(np.any(self._assign[rows[sorted_rows]] != assign[sorted_rows]))
+                self._assign[rows] = assign
+            self._flush()
+
+            # vectors first, then keys, then the count that makes them visible
+            with open(self._path("keys.jsonl"), "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(k) + "\n" for k in new_keys)
+            self._keys.extend(new_keys)
+            self._count += len(new_keys)
+            self._write_meta()
+            if self._centroids is not None and (moved or self._count - covered > self.max_ivf_tail):
+                self._build_lists()
+        return len(new_keys)
+
+    def get(self, key):
+        row = self._rows.get(key)
+        return None if row is None else np.asarray(self._vectors[row], dtype=np.float32)
+
+    def search(self, query, k: int = 10, nprobe: int = None, exclude=()):
+        """Top-k (key, cosine similarity) for one query vector, best first.
+
+        Uses the IVF clusters when built (nprobe clusters, default ~sqrt of
+        their number); pass nprobe=0 to force an exact brute-force scan.
+        """
+        return self.search_batch(np.asarray(query)[None, :], k, nprobe, exclude)[0]
+
+    def search_batch(self, queries, k: int = 10, nprobe: int = None, exclude=()):
+        """search() for a (Q, dim) matrix of queries; one result list per query."""
+        queries = self._normalize(queries)
+        exclude = set(exclude)
+        want = k + len(exclude)
+        with self._lock:
+            count = self._count
+            if count == 0:
+                return [[] for _ in queries]
+            if self._centroids is not None and nprobe != 0:
+                nprobe = nprobe or max(1, int(np.sqrt(len(self._centroids))))
+                hits = [self._search_ivf(q, want, nprobe, count) for q in queries]
+            else:
+                hits = self._search_exact(queries, want, count)
+            keys = self._keys
+        return [
+            [(keys[r], float(s)) for r, s in zip(rows, scores) if keys[r] not in exclude][:k]
+            for rows, scores in hits
+        ]
+
+    def _search_exact(self, queries, k, count):
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        q = queries.T
+        for start in range(0, count, self.block_rows):
+            block = np.asarray(self._vectors[start:min(start + self.block_rows, count)],
+                               dtype=np.float32)
+            scores = block @ q  # (rows, Q)
+            top = min(k, len(block))
+            idx = np.argpartition(-scores, top - 1, axis=0)[:top].T  # (Q, top)
+            best_rows = np.concatenate([best_rows, idx + start], axis=1)
+            best_scores = np.concatenate(
+                [best_scores, np.take_along_axis(scores.T, idx, axis=1)], axis=1)
+            if best_rows.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        return [(best_rows[i, order[i]], best_scores[i, order[i]]) for i in range(len(queries))]
+
+    def _search_ivf(self, q, k, nprobe, count):
+        lists = self._nearest_lists(q[None, :], nprobe)[0]
+        covered = min(len(self._order), count)
+        parts = [np.asarray(self._order[self._offsets[c]:self._offsets[c + 1]]) for c in lists]
+        if covered < count:
+            # rows added since the lists were sorted
+            tail = np.asarray(self._assign[covered:count])
+            parts.append(np.flatnonzero(np.isin(tail, lists)) + covered)
+        rows = np.concatenate(parts)
+        rows = rows[rows < count]
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = np.asarray(self._vectors[rows], dtype=np.float32) @ q
+        top = min(k, len(rows))
+        idx = np.argpartition(-scores, top - 1)[:top]
+        idx = idx[np.argsort(-scores[idx])]
+        return rows[idx], scores[idx]
+
+    def _nearest_lists(self, vectors, n):
+        sims = vectors @ self._centroids.T
+        n = min(n, sims.shape[1])
+        idx = np.argpartition(-sims, n - 1, axis=1)[:, :n]
+        return np.take_along_axis(idx, np.argsort(-np.take_along_axis(sims, idx, axis=1), axis=1), axis=1)
+
+    def build_ivf(self, n_lists: int = None, sample: int = 100_000, iters: int = 10, seed: int = 0):
+        """Cluster the vectors for approximate search (default ~4*sqrt(N) clusters)."""
+        with self._lock:
+            count = self._count
+            if count == 0:
+                raise ValueError("Cannot build IVF on an empty index")
+            n_lists = min(count, n_lists or max(1, int(4 * np.sqrt(count))))
+            rng = np.random.default_rng(seed)
+            pick = np.sort(rng.choice(count, size=min(sample, count), replace=False))
+            train = np.asarray(self._vectors[pick], dtype=np.float32)
+            centroids = train[rng.choice(len(train), size=n_lists, replace=False)]
+            for _ in range(iters):
+                assign = np.argmax(train @ centroids.T, axis=1)
+                for c in range(n_lists):
+                    members = train[assign == c]
+                    if len(members):
+                        centroids[c] = members.sum(axis=0)
+                centroids = self._normalize(centroids)
+
+            # lists sorted for the old clusters must not outlive them if we stop midway
+            if os.path.exists(self._path("ivf_lists.npy")):
+                os.remove(self._path("ivf_lists.npy"))
+            self._centroids = centroids
+            np.save(self._path("ivf_centroids.npy"), centroids)
+            self._assign = self._map_file("ivf_assign.bin", np.int32, 1, self._capacity)
+            for start in range(0, count, self.block_rows):
+                block = np.asarray(self._vectors[start:min(start + self.block_rows, count)],
+                                   dtype=np.float32)
+                self._assign[start:start + len(block)] = self._nearest_lists(block, 1)[:, 0]
+            self._flush()
+            self._build_lists()
+        return n_lists
+
+    def drop_ivf(self):
+        with self._lock:
+            self._centroids = None
+            self._assign = None
+            self._offsets = self._order = None
+            for name in ("ivf_centroids.npy", "ivf_assign.bin", "ivf_lists.npy"):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+
+    def _normalize(self, vectors):
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dim {self.dim}, got {vectors.shape[1]}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
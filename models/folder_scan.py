@@ -0,0 +1,305 @@
+import os
+import sqlite3
+import threading
+import time
+
+from models.batching import process_batch_isolated
+from models.cache import cache_dir, file_digest
+from models.image_classifier import IMAGE_EXTENSIONS
+from utils.log import get_logger
+
+_logger = get_logger("SCAN")
+
+
+def default_db_path() -> str:
+    return os.path.join(cache_dir(), "folder_scan.db")
+
+
+def scan_key(model_id: str, precision: str = "fp32", fast_decode: bool = True) -> str:
+    """Store key for one model configuration: precision and decoder shift scores,
+    so e.g. int8 results are never reused for fp32. The default fp32 + fast
+    decode configuration keeps the bare model id, like the result cache."""
+    key = model_id if precision == "fp32" else f"{model_id}@{precision}"
+    return key if fast_decode else f"{key}+pil"
+
+
+def _path_range(root: str):
+    """(low, high) bounds matching every path under root, usable with the path index."""
+    prefix = os.path.join(root, "")
+    return [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+
+
+class ScanStore:
+    """SQLite record of classified files: one row per (path, model_id).
+
+    model_id is a scan_key(), i.e. it includes a non-default precision or
+    decoder.
+
+    files keeps (size, mtime_ns, sha256, top_k) so a rescan can tell whether a
+    file changed without reading it; labels holds one row per top-k
+    prediction, indexed by (model_id, label, score) for queries.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or default_db_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT NOT NULL, model_id TEXT NOT NULL,
+                size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT,
+                top_k INTEGER NOT NULL, scanned_at REAL NOT NULL, error TEXT,
+                PRIMARY KEY (path, model_id)
+            );
+            CREATE INDEX IF NOT EXISTS files_hash ON files (model_id, sha256);
+            CREATE TABLE IF NOT EXISTS labels (
+                path TEXT NOT NULL, model_id TEXT NOT NULL, rank INTEGER NOT NULL,
+                label TEXT NOT NULL, score REAL NOT NULL,
+                PRIMARY KEY (path, model_id, rank)
+            );
+            CREATE INDEX IF NOT EXISTS labels_lookup ON labels (model_id, label, score);
+        """)
+        self._db.commit()
+
+    def known(self, model_id: str, root: str) -> dict:
+        """{path: (size, mtime_ns, sha256, top_k, error)} for files under root."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, size, mtime_ns, sha256, top_k, error FROM files "
+                "WHERE path >= ? AND path < ? AND model_id = ?",
+                (*_path_range(root), model_id),
+            ).fetchall()
+        return {r[0]: r[1:] for r in rows}
+
+    def results_for_hash(self, model_id: str, sha256: str, top_k: int):
+        """Stored predictions of any file with this content (a copy or a move)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT path FROM files WHERE model_id = ? AND sha256 = ? AND top_k >= ? "
+                "AND error IS NULL LIMIT 1",
+                (model_id, sha256, top_k),
+            ).fetchone()
+            if row is None:
+                return None
+            labels = self._db.execute(
+                "SELECT label, score FROM labels WHERE path = ? AND model_id = ? "
+                "ORDER BY rank LIMIT ?",
+                (row[0], model_id, top_k),
+            ).fetchall()
+        return [{"label": label, "score": score} for label, score in labels]
+
+    def record(self, model_id: str, entries):
+        """Upsert (path, size, mtime_ns, sha256, top_k, result, error) rows in one transaction."""
+        now = time.time()
+        with self._lock, self._db:
+            for path, size, mtime_ns, sha256, top_k, result, error in entries:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, model_id, size, mtime_ns, sha256, top_k, now, error),
+                )
+                self._db.execute("DELETE FROM labels WHERE path = ? AND model_id = ?",
+                                 (path, model_id))
+                self._db.executemany(
+                    "INSERT INTO labels VALUES (?, ?, ?, ?, ?)",
+                    [(path, model_id, rank, r["label"], r["score"])
+                     for rank, r in enumerate(result or [])],
+                )
+
+    def touch(self, model_id: str, entries):
+        """Update size/mtime of files whose content turned out unchanged."""
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ? AND model_id = ?",
+                [(size, mtime_ns, path, model_id) for path, size, mtime_ns in entries],
+            )
+
+    def remove(self, model_id: str, paths):
+        with self._lock, self._db:
+            for table in ("files", "labels"):
+                self._db.executemany(
+                    f"DELETE FROM {table} WHERE path = ? AND model_id = ?",
+                    [(p, model_id) for p in paths],
+                )
+
+    def query(self, label: str = None, min_score: float = 0.0, model_id: str = None,
+              top1: bool = False, root: str = None, limit: int = 100):
+        """Stored predictions as dicts, best score first; no model is run.
+
+        label matches case-insensitively as a substring (ImageNet labels are
+        comma-separated synonyms); top1 only considers each file's best label.
+        """
+        sql = "SELECT path, model_id, rank, label, score FROM labels WHERE score >= ?"
+        params = [min_score]
+        if label:
+            sql += " AND label LIKE ?"
+            params.append(f"%{label}%")
+        if model_id:
+            sql += " AND model_id = ?"
+            params.append(model_id)
+        if top1:
+            sql += " AND rank = 0"
+        if root:
+            sql += " AND path >= ? AND path < ?"
+            params += _path_range(os.path.abspath(root))
+        sql += " ORDER BY score DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [dict(zip(("path", "model_id", "rank", "label", "score"), r)) for r in rows]
+
+    def label_counts(self, model_id: str = None, min_score: float = 0.0, root: str = None):
+        """{label: files whose top prediction it is}, most common first."""
+        sql = "SELECT label, COUNT(*) FROM labels WHERE rank = 0 AND score >= ?"
+        params = [min_score]
+        if model_id:
+            sql += " AND model_id = ?"
+            params.append(model_id)
+        if root:
+            sql += " AND path >= ? AND path < ?"
+            params += _path_range(os.path.abspath(root))
+        sql += " GROUP BY label ORDER BY COUNT(*) DESC"
+        with self._lock:
+            return dict(self._db.execute(sql, params).fetchall())
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def iter_image_files(root: str, recursive: bool = True):
+    """Yield (path, stat) for image files under root; scandir reuses the directory read."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError as e:
+            _logger.warning("Skipping unreadable directory", path=directory, error=str(e))
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield entry.path, entry.stat()
+            except OSError:
+                continue
+
+
+class FolderScanner:
+    """Classify only the new or changed images under a folder.
+
+    A file whose size and mtime match the store is skipped without being
+    read. Otherwise it is hashed: unchanged content only refreshes the
+    stat, content already classified elsewhere (a copy or rename) reuses
+    those predictions, and everything else goes through the model in
+    batches. Files that disappeared are dropped from the store.
+    """
+
+    flush_every = 512  # stat/reuse updates buffered before a write
+    progress_interval_s = 1.0  # while walking, progress() runs at most this often
+
+    def __init__(self, model, store: ScanStore = None):
+        self.model = model
+        self.store = store or ScanStore()
+
+    @property
+    def key(self) -> str:
+        """The model's scan_key() in the store."""
+        return scan_key(self.model.model_id, getattr(self.model, "precision", "fp32"),
+                        getattr(self.model, "fast_decode", True))
+
+    def scan(self, root: str, batch_size: int = 32, recursive: bool = True, prune: bool = True,
+             progress=None, should_stop=None) -> dict:
+        """Bring the store up to date for root; returns counts per outcome.
+
+        Classification runs as the folder is walked, a batch at a time.
+        progress(counts) is called after each batch and periodically during
+        the walk; should_stop() is polled before every file and ends the scan
+        early (work so far is kept).
+        """
+        root = os.path.abspath(root)
+        model_id = self.key
+        top_k = self.model.top_k
+        known = self.store.known(model_id, root)
+        counts = {"seen": 0, "unchanged": 0, "touched": 0, "reused": 0, "classified": 0,
+                  "errors": 0, "removed": 0, "stopped": False}
+
+        pending, touched, reused = [], [], []
+        seen = set()
+
+        def flush():
+            self.store.touch(model_id, touched)
+            self.store.record(model_id, reused)
+            counts["touched"] += len(touched)
+            counts["reused"] += sum(1 for r in reused if r[6] is None)
+            touched.clear()
+            reused.clear()
+
+        def classify():
+            results = process_batch_isolated(self.model, [p[0] for p in pending], batch_size)
+            self.store.record(model_id, [
+                (path, size, mtime_ns, digest, top_k, result, error)
+                for (path, size, mtime_ns, digest), (result, error) in zip(pending, results)
+            ])
+            counts["classified"] += sum(1 for _, e in results if e is None)
+            counts["errors"] += sum(1 for _, e in results if e is not None)
+            pending.clear()
+
+        next_report = time.monotonic() + self.progress_interval_s
+        for path, st in iter_image_files(root, recursive):
+            if should_stop is not None and should_stop():
+                counts["stopped"] = True
+                break
+            seen.add(path)
+            counts["seen"] += 1
+            old = known.get(path)
+            # a file that failed before is only retried once it changes
+            if (old is not None and old[0] == st.st_size and old[1] == st.st_mtime_ns
+                    and old[3] >= top_k):
+                counts["unchanged"] += 1
+            else:
+                self._triage(path, st, old, top_k, pending, touched, reused, counts)
+
+            batch_done = len(pending) >= batch_size
+            if batch_done:
+                classify()
+            if len(touched) + len(reused) >= self.flush_every:
+                flush()
+            if progress is not None and (batch_done or time.monotonic() >= next_report):
+                progress(dict(counts))
+                next_report = time.monotonic() + self.progress_interval_s
+
+        if pending and not counts["stopped"]:
+            classify()
+        flush()
+        if progress is not None:
+            progress(dict(counts))
+
+        if prune and not counts["stopped"]:
+            gone = [p for p in known if p not in seen]
+            self.store.remove(model_id, gone)
+            counts["removed"] = len(gone)
+        _logger.info("Folder scan finished", root=root, **counts)
+        return counts
+
+    def _triage(self, path, st, old, top_k, pending, touched, reused, counts):
+        """Hash a possibly changed file and queue it as touched, reused or to classify."""
+        try:
+            digest = file_digest(path)
+        except OSError as e:
+            reused.append((path, st.st_size, st.st_mtime_ns, None, top_k, None, str(e)))
+            counts["errors"] += 1
+            return
+        if old is not None and old[2] == digest and old[3] >= top_k:
+            touched.append((path, st.st_size, st.st_mtime_ns))
+            return
+        previous = self.store.results_for_hash(self.key, digest, top_k)
+        if previous is not None:
+            reused.append((path, st.st_size, st.st_mtime_ns, digest, top_k, previous, None))
+            return
+        pending.append((path, st.st_size, st.st_mtime_ns, digest))
@@ -1,9 +1,36 @@
 from models.base_model import BaseAIModel
+from models.cache import file_digest
+from models.image_pipeline import StagedImagePipeline
 from utils.decorators import timeit, log_call, ensure_input
 from utils.mixins import LogMixin, ConfigMixin
-from PIL import Image
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+
+def list_images(directory: str, recursive: bool = True):
+    """Image files under directory, in a stable (sorted) order."""
+    import os
+
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, f) for f in sorted(files)
+                     if f.lower().endswith(IMAGE_EXTENSIONS))
+        if not recursive:
+            break
+    return paths
+
 
 class ImageClassifier(LogMixin, ConfigMixin, BaseAIModel):
+    top_k = 3
+    preprocess_stage = "decode"
+    # staged batch pipeline: decode threads (None = one per core, max 8) and
+    # how many decoded batches may wait for the model
+    decode_workers = None
+    prefetch_batches = 2
+    # JPEG draft decoding + fused NumPy normalize (see models.image_loader)
+    fast_decode = True
+
     def __init__(self, model_id="google/vit-base-patch16-224"):
         super().__init__(model_id, task_name="image-classification")
 
@@ -12,11 +39,83 @@ class ImageClassifier(LogMixin, ConfigMixin, BaseAIModel):
     @ensure_input((str,))
     def process(self, input_data: str):
         # input_data is a file path
+        return self._with_cache([input_data], lambda xs: [self._run_one(xs[0])])[0]
+
+    @timeit
+    @log_call("MODEL")
+    @ensure_input((str,), batch=True)
+    def process_batch(self, inputs, batch_size=None):
+        # inputs is a list of file paths
+        if not inputs:
+            return []
+        return self._with_cache(list(inputs), lambda xs: self._run_batch(xs, batch_size))
+
+    @timeit
+    @log_call("MODEL")
+    @ensure_input((str,))
+    def embed(self, input_data: str):
+        """Pooled ViT features for one image file, as a float32 NumPy vector."""
+        return self.embed_batch([input_data])[0]
+
+    @timeit
+    @log_call("MODEL")
+    @ensure_input((str,), batch=True)
+    def embed_batch(self, inputs, batch_size=None):
+        """(len(inputs), hidden_size) float32 array of pooled features, in input order.
+
+        Not result-cached; store vectors in a models.embedding_index.EmbeddingIndex.
+        """
+        import numpy as np
+
         pipe = self.load()
-        self.log(f"Running image classification on {input_data}...")
-        
-        img = Image.open(input_data).convert("RGB")
-        out = pipe(img)
-        
-        # take top-3
-        return [{"label": x["label"], "score": float(x["score"])} for x in out[:3]]
+        if not inputs:
+            return np.zeros((0, pipe.model.config.hidden_size), dtype=np.float32)
+        batch_size = batch_size or self.default_batch_size
+        self.log(f"Embedding {len(inputs)} images (batch_size={batch_size})...")
+        staged = StagedImagePipeline(
+            pipe, batch_size=batch_size, decode_workers=self.decode_workers,
+            prefetch_batches=self.prefetch_batches, fast_decode=self.fast_decode,
+            model_id=self._model_id, embed=True,
+        )
+        return np.stack(list(staged.run(inputs))).astype(np.float32, copy=False)
+
+    def process_directory(self, directory: str, batch_size=None, recursive=True):
+        """Classify every image under directory; yields (path, result) as batches finish."""
+        paths = list_images(directory, recursive)
+        batch_size = batch_size or self.default_batch_size
+        # hand process_batch a few batches at a time so results stream out
+        step = batch_size * max(1, self.prefetch_batches) * 4
+        for start in range(0, len(paths), step):
+            chunk = paths[start:start + step]
+            yield from zip(chunk, self.process_batch(chunk, batch_size=batch_size))
+
+    def _run_one(self, input_data: str):
+        if self.micro_batching:
+            # coalesce with concurrent callers into one forward pass
+            return self.get_batcher().submit(input_data).result()
+        # same decoder as process_batch, so both agree on what they cache
+        return self._run_batch([input_data], batch_size=1)[0]
+
+    def _run_batch(self, inputs, batch_size=None):
+        pipe = self.load()
+        batch_size = batch_size or self.default_batch_size
+        self.log(f"Running image classification on {len(inputs)} images (batch_size={batch_size})...")
+
+        # decoding overlaps the forward pass; only prefetch_batches are held in memory
+        staged = StagedImagePipeline(
+            pipe, batch_size=batch_size, decode_workers=self.decode_workers,
+            prefetch_batches=self.prefetch_batches, top_k=self.top_k,
+            fast_decode=self.fast_decode, model_id=self._model_id,
+        )
+        return list(staged.run(inputs))
+
+    def _warmup(self, pipe):
+        from PIL import Image
+
+        pipe(Image.new("RGB", (224, 224)))
+
+    def _cache_key(self, input_data: str) -> str:
+        # top_k changes the shape of the result and the decoder shifts scores slightly,
+        # so both are part of the key
+        decode = "fast" if self.fast_decode else "pil"
+        return f"top{self.top_k}:{decode}:{file_digest(input_data)}"
@@ -0,0 +1,70 @@
+class FastImageLoader:
+    """Decode images close to the model's input size, straight into a batch array.
+
+    - JPEGs are decoded with PIL draft mode, which lets libjpeg scale by
+      1/2, 1/4 or 1/8 during decoding instead of producing every pixel
+    - convert("RGB") is skipped when the image already is RGB
+    - resize happens once, then rescale + normalize is one fused NumPy
+      multiply-add written into a preallocated (N, C, H, W) float32 array
+
+    Only fixed-size processors (ViT-style {"height", "width"}, no center
+    crop) are supported; for_processor() returns None otherwise.
+    """
+
+    def __init__(self, height, width, mean, std, rescale_factor=1 / 255, resample=None):
+        import numpy as np
+        from PIL import Image
+
+        self.height = height
+        self.width = width
+        self.resample = Image.BILINEAR if resample is None else resample
+        mean = np.asarray(mean, dtype=np.float32).reshape(1, 1, 3)
+        std = np.asarray(std, dtype=np.float32).reshape(1, 1, 3)
+        # (x * rescale - mean) / std  ==  x * scale + shift
+        self._scale = (rescale_factor / std).astype(np.float32)
+        self._shift = (-mean / std).astype(np.float32)
+
+    @classmethod
+    def for_processor(cls, processor):
+        size = getattr(processor, "size", None) or {}
+        if (
+            not getattr(processor, "do_resize", False)
+            or "height" not in size or "width" not in size
+            or getattr(processor, "do_center_crop", False)
+        ):
+            return None
+        do_norm = getattr(processor, "do_normalize", True)
+        do_rescale = getattr(processor, "do_rescale", True)
+        return cls(
+            size["height"], size["width"],
+            mean=processor.image_mean if do_norm else (0.0, 0.0, 0.0),
+            std=processor.image_std if do_norm else (1.0, 1.0, 1.0),
+            rescale_factor=processor.rescale_factor if do_rescale else 1.0,
+            resample=getattr(processor, "resample", None),
+        )
+
+    def allocate(self, n):
+        import numpy as np
+
+        return np.empty((n, 3, self.height, self.width), dtype=np.float32)
+
+    def load_into(self, path, out, index):
+        """Decode path and write its normalized pixels into out[index]."""
+        import numpy as np
+        from PIL import Image
+
+        with Image.open(path) as img:
+            img.draft("RGB", (self.width, self.height))  # no-op for non-JPEG
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            img = img.resize((self.width, self.height), resample=self.resample)
+            pixels = np.asarray(img, dtype=np.float32)  # H, W, C
+        np.multiply(pixels, self._scale, out=pixels)
+        np.add(pixels, self._shift, out=pixels)
+        out[index] = pixels.transpose(2, 0, 1)
+
+    def load_batch(self, paths):
+        out = self.allocate(len(paths))
+        for i, p in enumerate(paths):
+            self.load_into(p, out, i)
+        return out
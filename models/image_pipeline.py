@@ -0,0 +1,136 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from models.image_loader import FastImageLoader
+from utils.metrics import get_metrics
+
+_DONE = object()
+
+
+class StagedImagePipeline:
+    """Overlapped decode -> forward -> postprocess for batches of image files.
+
+    A thread pool decodes and preprocesses images into tensors (PIL and the
+    NumPy resize/normalize release the GIL), a bounded prefetch queue feeds
+    ready batches to the model, and postprocessing of one batch runs while
+    the next batch is in the forward pass.
+    """
+
+    def __init__(self, pipe, batch_size=8, decode_workers=None, prefetch_batches=2, top_k=3,
+                 fast_decode=True, model_id=None, embed=False):
+        self._pipe = pipe
+        self._model_id = model_id or getattr(pipe.model, "name_or_path", "images")
+        # None when the processor needs the generic (slower) path
+        self._loader = FastImageLoader.for_processor(pipe.image_processor) if fast_decode else None
+        self.batch_size = batch_size
+        self.decode_workers = decode_workers or min(8, os.cpu_count() or 1)
+        self.prefetch_batches = prefetch_batches
+        self.top_k = top_k
+        # yield pooled backbone features instead of top-k labels
+        self.embed = embed
+
+    def _prepare(self, path):
+        """Decode one file into a (1, C, H, W) pixel tensor."""
+        from PIL import Image
+
+        with get_metrics().time(self._model_id, "decode"):
+            with Image.open(path) as img:
+                img = img.convert("RGB")
+            return self._pipe.image_processor(images=img, return_tensors="pt")["pixel_values"]
+
+    def _load_into(self, path, out, index):
+        with get_metrics().time(self._model_id, "decode"):
+            self._loader.load_into(path, out, index)
+
+    def _submit(self, decode, chunk):
+        """Start decoding a chunk; returns (futures, assemble) for the batch tensor."""
+        import torch
+
+        if self._loader is not None:
+            # workers write straight into one preallocated batch array
+            out = self._loader.allocate(len(chunk))
+            futures = [decode.submit(self._load_into, p, out, i) for i, p in enumerate(chunk)]
+            return futures, lambda: torch.from_numpy(out)
+        futures = [decode.submit(self._prepare, p) for p in chunk]
+        return futures, lambda: torch.cat([f.result() for f in futures])
+
+    def _postprocess(self, logits):
+        import torch
+
+        with get_metrics().time(self._model_id, "postprocess", items=len(logits)):
+            id2label = self._pipe.model.config.id2label
+            probs = torch.softmax(logits.float(), dim=-1)
+            scores, ids = probs.topk(min(self.top_k, probs.shape[-1]), dim=-1)
+            return [
+                [{"label": id2label[i], "score": float(s)} for s, i in zip(row_s.tolist(), row_i.tolist())]
+                for row_s, row_i in zip(scores, ids)
+            ]
+
+    def _forward(self, batch):
+        if not self.embed:
+            return self._pipe.forward({"pixel_values": batch})["logits"]
+        import torch
+
+        # [CLS] token of the final (layer-normed) hidden state; what the head classifies
+        with torch.inference_mode():
+            hidden = self._pipe.model.base_model(pixel_values=batch).last_hidden_state
+        return hidden[:, 0]
+
+    def _postprocess_embeddings(self, features):
+        with get_metrics().time(self._model_id, "postprocess", items=len(features)):
+            return list(features.float().numpy())
+
+    def run(self, paths):
+        """Yield one top-k result list (or embedding vector) per path, in input order.
+
+        A file that fails to decode raises its exception when its batch is reached.
+        """
+        paths = list(paths)
+        ready = queue.Queue(maxsize=self.prefetch_batches)
+        stop = threading.Event()
+
+        with ThreadPoolExecutor(self.decode_workers, thread_name_prefix="decode") as decode, \
+                ThreadPoolExecutor(1, thread_name_prefix="postprocess") as post:
+
+            def feed():
+                # queue.put blocks when prefetch_batches are waiting, which bounds
+                # how many decoded images are held in memory at once
+                try:
+                    for start in range(0, len(paths), self.batch_size):
+                        if stop.is_set():
+                            return
+                        chunk = paths[start:start + self.batch_size]
+                        ready.put(self._submit(decode, chunk))
+                finally:
+                    ready.put(_DONE)
+
+            feeder = threading.Thread(target=feed, name="prefetch", daemon=True)
+            feeder.start()
+            pending = []
+            try:
+                while True:
+                    item = ready.get()
+                    if item is _DONE:
+                        break
+                    futures, assemble = item
+                    for f in futures:
+                        f.result()  # re-raise decode errors
+                    batch = assemble()
+                    out = self._forward(batch)
+                    finish = self._postprocess_embeddings if self.embed else self._postprocess
+                    pending.append(post.submit(finish, out))
+                    # hand back finished batches while the next one runs
+                    while pending and pending[0].done():
+                        yield from pending.pop(0).result()
+                for fut in pending:
+                    yield from fut.result()
+            finally:
+                stop.set()
+                # unblock the feeder if we stopped early
+                while feeder.is_alive():
+                    try:
+                        ready.get_nowait()
+                    except queue.Empty:
+                        feeder.join(0.05)
@@ -0,0 +1,141 @@
+import glob
+import hashlib
+import os
+import re
+
+from models.cache import cache_dir
+from models.snapshots import has_snapshot, load_snapshot_pipeline, snapshot_path, snapshot_revision
+
+PRECISIONS = ("fp32", "bf16", "int8")
+
+
+def _quantized_prefix(model_id: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "--", model_id)
+    return os.path.join(cache_dir("quantized"), safe)
+
+
+def quantized_path(model_id: str) -> str:
+    """Where the int8 state_dict of model_id is kept so it is quantized only once.
+
+    The name includes the torch and transformers versions and the snapshot
+    revision, so an upgrade or a re-downloaded checkpoint re-quantizes.
+    """
+    import torch
+    import transformers
+
+    version = f"{torch.__version__}|{transformers.__version__}|{snapshot_revision(model_id)}"
+    digest = hashlib.sha256(version.encode("utf-8")).hexdigest()[:16]
+    return f"{_quantized_prefix(model_id)}.{digest}.int8.pt"
+
+
+def _preprocessor_kwargs(task: str, model_id: str) -> dict:
+    # a pipeline built from a model object needs its preprocessor named explicitly
+    source = snapshot_path(model_id) if has_snapshot(model_id) else model_id
+    if task.startswith("image"):
+        return {"image_processor": source}
+    return {"tokenizer": source}
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantization of every nn.Linear (weights int8, activations fp32)."""
+    import torch
+
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+# model class per pipeline task, for building an int8 skeleton without fp32 weights
+_AUTO_MODELS = {
+    "text-classification": "AutoModelForSequenceClassification",
+    "image-classification": "AutoModelForImageClassification",
+}
+
+
+def _model_skeleton(task: str, model_id: str):
+    """Module tree of model_id from its config alone: no weight file is read
+    and parameter init is skipped, since every tensor is overwritten next."""
+    import contextlib
+    import transformers
+
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:
+        no_init_weights = contextlib.nullcontext
+    source = snapshot_path(model_id) if has_snapshot(model_id) else model_id
+    config = transformers.AutoConfig.from_pretrained(source)
+    auto = getattr(transformers, _AUTO_MODELS[task])
+    with no_init_weights():
+        model = auto.from_config(config)
+    return model.eval()
+
+
+def _int8_model(task: str, model_id: str):
+    """Quantized model for model_id; the fp32 weights are only read on a cache miss.
+
+    A hit quantizes an uninitialized skeleton built from the config (cheap:
+    there is nothing real to pack) and loads the cached int8 state_dict into
+    it with weights_only=True. A miss quantizes the fp32 model (the resident
+    copy when one is loaded, e.g. a cascade's full stage) and writes the
+    state_dict to quantized_path().
+    """
+    import torch
+    from models.registry import get_weight_cache
+
+    path = quantized_path(model_id)
+    if os.path.exists(path) and task in _AUTO_MODELS:
+        model = quantize_int8(_model_skeleton(task, model_id))
+        model.load_state_dict(torch.load(path, weights_only=True))
+        return model
+    resident = get_weight_cache().peek(model_id, task, "fp32")
+    fp32 = resident.model if resident is not None else load_snapshot_pipeline(task, model_id).model
+    # quantize_dynamic copies, so a shared fp32 model is left untouched
+    model = quantize_int8(fp32)
+    tmp = path + ".tmp"
+    torch.save(model.state_dict(), tmp)
+    os.replace(tmp, path)
+    # copies made by other library versions or an older snapshot are dead weight now
+    for old in glob.glob(glob.escape(_quantized_prefix(model_id)) + ".*.int8.pt"):
+        if old != path:
+            os.remove(old)
+    return model
+
+
+def enable_bf16_autocast(pipe):
+    """Run the pipeline's forward pass under CPU bf16 autocast.
+
+    Weights stay fp32; matmuls run in bf16. Logits are cast back to fp32 so
+    postprocessing (softmax, top-k) behaves exactly as before.
+    """
+    import torch
+
+    forward = pipe._forward
+
+    def _forward(*a, **k):
+        with torch.autocast("cpu", dtype=torch.bfloat16):
+            out = forward(*a, **k)
+        if "logits" in out:
+            out["logits"] = out["logits"].float()
+        return out
+
+    pipe._forward = _forward
+    return pipe
+
+
+def load_pipeline(task: str, model_id: str, precision: str = "fp32"):
+    """Build a transformers pipeline for model_id in the requested precision.
+
+    Weights come from the local safetensors snapshot (see models.snapshots).
+    int8 weights are written to quantized_path() on first use and read back
+    from there afterwards.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; expected one of {PRECISIONS}")
+    from transformers import pipeline
+
+    if precision == "int8":
+        model = _int8_model(task, model_id)
+        return pipeline(task, model=model, **_preprocessor_kwargs(task, model_id))
+
+    pipe = load_snapshot_pipeline(task, model_id)
+    if precision == "bf16":
+        enable_bf16_autocast(pipe)
+    return pipe
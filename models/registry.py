@@ -0,0 +1,239 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+def model_memory_bytes(pipe) -> int:
+    """Bytes held by a pipeline's weights (0 if unknown).
+
+    Walks the state dict rather than parameters() so dynamically quantized
+    layers, whose packed int8 weights are not parameters, are counted too.
+    """
+    model = getattr(pipe, "model", None)
+    if model is None or not hasattr(model, "state_dict"):
+        return 0
+
+    def nbytes(value):
+        if isinstance(value, (tuple, list)):
+            return sum(nbytes(v) for v in value)
+        if hasattr(value, "element_size"):
+            return value.numel() * value.element_size()
+        return 0
+
+    return sum(nbytes(v) for v in model.state_dict().values())
+
+
+def process_rss_bytes() -> int:
+    """Current resident set size of this process (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+class WeightCache:
+    """Process-wide cache of loaded pipelines keyed by (model_id, task, variant).
+
+    The variant distinguishes differently prepared copies of the same
+    weights, e.g. the fp32 and int8 versions of one checkpoint.
+
+    A model instance that is rebuilt (e.g. "Reload Current Model") gets its
+    weights from here instead of deserializing them from disk again.
+    """
+
+    def __init__(self):
+        self._pipes = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, model_id: str, task: str, loader, variant: str = "fp32"):
+        key = (model_id, task, variant)
+        with self._lock:
+            if key in self._pipes:
+                return self._pipes[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # single-flight per key, without blocking loads of other models
+        with key_lock:
+            with self._lock:
+                if key in self._pipes:
+                    return self._pipes[key]
+            pipe = loader()
+            with self._lock:
+                self._pipes[key] = pipe
+            return pipe
+
+    def peek(self, model_id: str, task: str, variant: str = "fp32"):
+        """The cached pipeline, or None; never loads."""
+        with self._lock:
+            return self._pipes.get((model_id, task, variant))
+
+    def contains(self, model_id: str, task: str, variant: str = "fp32") -> bool:
+        with self._lock:
+            return (model_id, task, variant) in self._pipes
+
+    def drop(self, model_id: str, task: str = None, variant: str = None):
+        with self._lock:
+            for key in [k for k in self._pipes if k[0] == model_id and task in (None, k[1])
+                        and variant in (None, k[2])]:
+                del self._pipes[key]
+
+    def clear(self):
+        with self._lock:
+            self._pipes.clear()
+
+    def model_ids(self) -> set:
+        with self._lock:
+            return {k[0] for k in self._pipes}
+
+    def usage(self) -> dict:
+        """Parameter memory in bytes for every cached pipeline."""
+        with self._lock:
+            pipes = dict(self._pipes)
+        return {key: model_memory_bytes(pipe) for key, pipe in pipes.items()}
+
+
+_weight_cache = WeightCache()
+
+
+def get_weight_cache() -> WeightCache:
+    return _weight_cache
+
+
+class ModelRegistry:
+    """Thread-safe owner of model instances.
+
+    - get() constructs each model at most once, even under concurrent calls
+    - lease() marks a model busy so it is never evicted mid-inference
+    - idle models are evicted least-recently-used first when resident
+      parameter memory exceeds max_param_mb or process RSS exceeds max_rss_mb
+    """
+
+    def __init__(self, max_param_mb: float = None, max_rss_mb: float = None, weights=None):
+        self.max_param_mb = max_param_mb
+        self.max_rss_mb = max_rss_mb
+        self._weights = weights or get_weight_cache()
+        self._models = OrderedDict()  # name -> model, least recently used first
+        self._in_use = {}
+        self._last_used = {}
+        self._evict_on_release = {}  # busy models to evict when their lease ends
+        self._lock = threading.RLock()
+
+    def get(self, name: str, factory):
+        """Return the model registered under name, building it with factory() once."""
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                model = factory()
+                self._models[name] = model
+                self._in_use[name] = 0
+            self._models.move_to_end(name)
+            self._last_used[name] = time.time()
+            return model
+
+    def peek(self, name: str):
+        """The resident model for name, or None; does not construct or touch LRU order."""
+        with self._lock:
+            return self._models.get(name)
+
+    @contextmanager
+    def lease(self, name: str, factory):
+        """Use a model for one job; it cannot be evicted until the block exits."""
+        with self._lock:
+            model = self.get(name, factory)
+            self._in_use[name] += 1
+        try:
+            yield model
+        finally:
+            with self._lock:
+                pending = None
+                if self._models.get(name) is model:
+                    self._in_use[name] -= 1
+                    self._last_used[name] = time.time()
+                    if self._in_use[name] == 0:
+                        pending = self._evict_on_release.pop(name, None)
+            if pending is not None:
+                self.evict(name, drop_weights=pending)
+            self.enforce_budget()
+
+    def evict(self, name: str, drop_weights: bool = True) -> bool:
+        """Forget a model instance; keep its weights cached unless drop_weights.
+
+        A model that is leased right now is evicted when its last lease ends.
+        """
+        with self._lock:
+            if self._in_use.get(name, 0) > 0:
+                self._evict_on_release[name] = drop_weights
+                return False
+            model = self._models.pop(name, None)
+            self._in_use.pop(name, None)
+            self._last_used.pop(name, None)
+            if model is None:
+                return False
+            still_shared = any(
+                m.model_id == model.model_id for m in self._models.values()
+            )
+        model.close()
+        if drop_weights and not still_shared:
+            self._weights.drop(model.model_id)
+        return True
+
+    def reload(self, name: str):
+        """Rebuild the instance on next get(); weights come back from the cache."""
+        return self.evict(name, drop_weights=False)
+
+    def clear(self):
+        """Evict every model and free all cached weights not used by a busy model."""
+        with self._lock:
+            names = list(self._models)
+        for name in names:
+            self.evict(name)
+        with self._lock:
+            keep = {m.model_id for m in self._models.values()}
+        for model_id in self._weights.model_ids() - keep:
+            self._weights.drop(model_id)
+
+    def enforce_budget(self):
+        """Evict idle models, least recently used first, until within budget."""
+        while self._over_budget():
+            with self._lock:
+                # always keep the most recently used model resident
+                newest = next(reversed(self._models), None)
+                idle = [n for n in self._models if n != newest
+                        and self._in_use.get(n, 0) == 0 and self._models[n].is_loaded]
+            if not idle:
+                return
+            self.evict(idle[0])
+
+    def _over_budget(self) -> bool:
+        if self.max_param_mb is not None:
+            used = sum(self._weights.usage().values())
+            if used > self.max_param_mb * 1024 * 1024:
+                return True
+        if self.max_rss_mb is not None:
+            rss = process_rss_bytes()
+            if rss and rss > self.max_rss_mb * 1024 * 1024:
+                return True
+        return False
+
+    def resident(self) -> list:
+        """Which models are resident, how much memory each uses, and whether busy."""
+        usage = self._weights.usage()
+        with self._lock:
+            rows = []
+            for name, model in self._models.items():
+                rows.append({
+                    "name": name,
+                    "model_id": model.model_id,
+                    "status": model.status,
+                    "memory_bytes": sum(
+                        b for k, b in usage.items() if k[:2] == (model.model_id, model.task_name)
+                    ),
+                    "in_use": self._in_use.get(name, 0),
+                    "last_used": self._last_used.get(name),
+                })
+            return rows
@@ -0,0 +1,82 @@
+import os
+import re
+import shutil
+import tempfile
+
+from models.cache import cache_dir
+
+COMPLETE_MARKER = ".snapshot-complete"
+
+
+def snapshots_enabled() -> bool:
+    """Snapshots are on unless MODEL_SNAPSHOTS=0."""
+    return os.environ.get("MODEL_SNAPSHOTS", "1") != "0"
+
+
+def snapshot_path(model_id: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "--", model_id)
+    return os.path.join(cache_dir("snapshots"), safe)
+
+
+def has_snapshot(model_id: str) -> bool:
+    return os.path.exists(os.path.join(snapshot_path(model_id), COMPLETE_MARKER))
+
+
+def snapshot_revision(model_id: str) -> str:
+    """Changes whenever the local weights for model_id are rewritten.
+
+    Taken from the snapshot's completion marker, or from the files of a
+    local model directory; "hub" when the weights are not on disk.
+    """
+    if os.path.isdir(model_id):
+        stats = [os.stat(e.path) for e in os.scandir(model_id) if e.is_file()]
+        return str(max((st.st_mtime_ns for st in stats), default=0))
+    if has_snapshot(model_id):
+        return str(os.stat(os.path.join(snapshot_path(model_id), COMPLETE_MARKER)).st_mtime_ns)
+    return "hub"
+
+
+def save_snapshot(pipe, model_id: str) -> str:
+    """Write pipe's weights (safetensors), config and preprocessor to the snapshot dir.
+
+    Written to a temp dir and renamed into place, so a concurrent loader sees
+    either nothing or a complete snapshot. A directory left at the target
+    without the completion marker is replaced.
+    """
+    target = snapshot_path(model_id)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(target))
+    try:
+        pipe.save_pretrained(tmp, safe_serialization=True)
+        open(os.path.join(tmp, COMPLETE_MARKER), "w").close()
+        if os.path.isdir(target) and not has_snapshot(model_id):
+            shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+    except OSError:
+        # lost the race to another process, or the save failed; either way ours goes
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not has_snapshot(model_id):
+            raise
+    return target
+
+
+def drop_snapshot(model_id: str):
+    shutil.rmtree(snapshot_path(model_id), ignore_errors=True)
+
+
+def load_snapshot_pipeline(task: str, model_id: str):
+    """Pipeline for model_id, served from its local snapshot when one exists.
+
+    Snapshot loads pass local_files_only so there is no hub resolution or
+    network check. The first load goes through the hub as usual and then
+    writes the snapshot.
+    """
+    from transformers import pipeline
+
+    if os.path.isdir(model_id) or not snapshots_enabled():
+        return pipeline(task, model=model_id)
+    if has_snapshot(model_id):
+        return pipeline(task, model=snapshot_path(model_id),
+                        model_kwargs={"local_files_only": True})
+    pipe = pipeline(task, model=model_id)
+    save_snapshot(pipe, model_id)
+    return pipe
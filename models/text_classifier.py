@@ -1,8 +1,33 @@
 from models.base_model import BaseAIModel
+from models.cache import text_digest
+from models.chunking import iter_token_windows, classify_windows, aggregate
 from utils.decorators import timeit, log_call, ensure_input
+from utils.jobs import check_cancelled
 from utils.mixins import LogMixin, ConfigMixin
 
+def _is_wordpiece(tokenizer) -> bool:
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        return type(backend.model).__name__ == "WordPiece"
+    return hasattr(tokenizer, "wordpiece_tokenizer")
+
+
+def _until_cancelled(windows):
+    # a cancelled GUI job stops between windows instead of scoring the whole document
+    for w in windows:
+        check_cancelled()
+        yield w
+
+
 class TextClassifier(LogMixin, ConfigMixin, BaseAIModel):
+    preprocess_stage = "tokenize"
+
+    # texts over the model's token limit are scored in overlapping windows
+    long_text = True
+    window_overlap = 64
+    # sort batches by token length so each one pads only to similar-length texts
+    length_bucketing = True
+
     def __init__(self, model_id="distilbert-base-uncased-finetuned-sst-2-english"):
         super().__init__(model_id, task_name="text-classification")
 
@@ -10,10 +35,114 @@ class TextClassifier(LogMixin, ConfigMixin, BaseAIModel):
     @log_call("MODEL")
     @ensure_input((str,))
     def process(self, input_data: str):
+        return self._with_cache([input_data], lambda xs: [self._run_one(xs[0])])[0]
+
+    @timeit
+    @log_call("MODEL")
+    @ensure_input((str,), batch=True)
+    def process_batch(self, inputs, batch_size=None):
+        if not inputs:
+            return []
+        return self._with_cache(list(inputs), lambda xs: self._run_batch(xs, batch_size))
+
+    @timeit
+    @log_call("MODEL")
+    @ensure_input((str,))
+    def process_document(self, input_data: str, from_file: bool = False, batch_size=None):
+        """Document-level sentiment for text of any length.
+
+        The text (or, with from_file=True, the file at that path) is streamed
+        into overlapping token windows that run as batches; the result adds
+        per-chunk scores to the usual {"label", "score"}.
+        """
+        nlp = self.load()
+        batch_size = batch_size or self.default_batch_size
+        window = self._window_size(nlp)
+        self.log(f"Running long-text classification (window={window}, overlap={self.window_overlap})...")
+
+        if from_file:
+            with open(input_data, "r", encoding="utf-8") as f:
+                return self._classify_document(nlp, f, window, batch_size)
+        return self._classify_document(nlp, input_data, window, batch_size)
+
+    def _classify_document(self, nlp, source, window, batch_size):
+        windows = iter_token_windows(nlp.tokenizer, source, window, self.window_overlap)
+        results = classify_windows(nlp, _until_cancelled(windows), batch_size)
+        return aggregate(results, nlp.model.config.id2label, self.window_overlap)
+
+    @staticmethod
+    def _window_size(nlp):
+        # tokens per window, leaving room for [CLS]/[SEP]
+        limit = min(nlp.tokenizer.model_max_length,
+                    getattr(nlp.model.config, "max_position_embeddings", 512))
+        return limit - nlp.tokenizer.num_special_tokens_to_add()
+
+    def _is_long(self, nlp, text: str) -> bool:
+        if not self.long_text:
+            return False
+        window = self._window_size(nlp)
+        # WordPiece yields at most one token per character, so short strings skip
+        # tokenizing; byte-level BPE and SentencePiece can split one character further
+        if len(text) <= window and _is_wordpiece(nlp.tokenizer):
+            return False
+        return len(nlp.tokenizer(text, add_special_tokens=False)["input_ids"]) > window
+
+    def _run_one(self, input_data: str):
+        if self._is_long(self.load(), input_data):
+            return self.process_document(input_data)
+        if self.micro_batching:
+            # coalesce with concurrent callers into one forward pass
+            return self.get_batcher().submit(input_data).result()
         nlp = self.load()
         self.log("Running text classification...")
         
         out = nlp(input_data)
         
+        return self._normalize(out[0])
+
+    def _run_batch(self, inputs, batch_size=None):
+        nlp = self.load()
+        batch_size = batch_size or self.default_batch_size
+        self.log(f"Running text classification on {len(inputs)} texts (batch_size={batch_size})...")
+
+        results = [None] * len(inputs)
+        lengths = self._token_lengths(nlp, inputs)
+        window = self._window_size(nlp)
+        short = []
+        for i, text in enumerate(inputs):
+            if self.long_text and lengths[i] > window:
+                results[i] = self.process_document(text, batch_size=batch_size)
+            else:
+                short.append(i)
+
+        if self.length_bucketing:
+            # the pipeline pads each batch to its longest member; neighbours in
+            # length order keep that padding tight
+            short.sort(key=lengths.__getitem__)
+        out = nlp([inputs[i] for i in short], batch_size=batch_size) if short else []
+        # write back by original index, so input order is restored
+        for i, pred in zip(short, out):
+            results[i] = self._normalize(pred)
+        return results
+
+    def _token_lengths(self, nlp, texts):
+        """Token count per text (one fast batched tokenizer call), or 0s if unused."""
+        if not (self.long_text or self.length_bucketing):
+            return [0] * len(texts)
+        encoded = nlp.tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    def _warmup(self, pipe):
+        pipe(["warm up the model"] * 2, batch_size=2)
+
+    def _cache_key(self, input_data: str) -> str:
+        return text_digest(input_data)
+
+    def _cacheable(self, result) -> bool:
+        # long-document results carry every chunk's scores; too big for the LRU
+        return "chunks" not in result
+
+    @staticmethod
+    def _normalize(pred):
         # normalize to a simple dict
-        return {"label": out[0]["label"], "score": float(out[0]["score"])}
+        return {"label": pred["label"], "score": float(pred["score"])}
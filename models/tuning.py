@@ -0,0 +1,151 @@
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+
+from models.cache import cache_dir
+from utils.log import get_logger
+
+_logger = get_logger("TUNE")
+_lock = threading.Lock()
+_profile = None
+_threads_source = None  # profile key whose thread counts this process runs with
+
+
+def profile_path() -> str:
+    """Runtime profile location (RUNTIME_PROFILE or <cache dir>/runtime_profile.json)."""
+    return os.environ.get("RUNTIME_PROFILE") or os.path.join(cache_dir(), "runtime_profile.json")
+
+
+def host_key() -> str:
+    # a profile tuned on one machine says little about another
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count()}cpu"
+
+
+def load_profile(reload: bool = False) -> dict:
+    global _profile
+    with _lock:
+        if _profile is None or reload:
+            try:
+                with open(profile_path(), "r", encoding="utf-8") as f:
+                    _profile = json.load(f)
+            except (OSError, ValueError):
+                _profile = {}
+        return _profile
+
+
+def profile_key(model_id: str, precision: str = "fp32") -> str:
+    # bf16/int8 kernels scale differently with threads, so each mode is tuned separately
+    return model_id if precision == "fp32" else f"{model_id}@{precision}"
+
+
+def get_model_profile(model_id: str, precision: str = "fp32"):
+    """Tuned settings for model_id at this precision on this host, or None."""
+    profile = load_profile()
+    if profile.get("host") != host_key():
+        return None
+    return profile.get("models", {}).get(profile_key(model_id, precision))
+
+
+def save_model_profile(model_id: str, settings: dict, precision: str = "fp32"):
+    """Merge settings for model_id at precision into the profile file (written atomically)."""
+    profile = dict(load_profile(reload=True))
+    if profile.get("host") != host_key():
+        profile = {"host": host_key(), "models": {}}
+    profile.setdefault("models", {})[profile_key(model_id, precision)] = settings
+    path = profile_path()
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp, path)
+    load_profile(reload=True)
+    return path
+
+
+def apply_threads(num_threads: int):
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def apply_profile(model) -> bool:
+    """Apply the saved threads and batch size for model; False if none is saved.
+
+    Thread counts are process-wide in torch, so only the first profile
+    applied in a process sets them; models loaded later keep those and only
+    take their batch size. The batch size goes to model.tuned_batch_size,
+    so one set explicitly (set_config(default_batch_size=...)) still wins
+    and a later profile, e.g. after a precision switch, replaces it.
+    """
+    global _threads_source
+    key = profile_key(model.model_id, model.precision)
+    settings = get_model_profile(model.model_id, model.precision)
+    model.tuned_batch_size = settings["batch_size"] if settings else None
+    if not settings:
+        return False
+    with _lock:
+        first = _threads_source is None
+        if first:
+            _threads_source = key
+    if first:
+        apply_threads(settings["num_threads"])
+    elif _threads_source != key:
+        _logger.debug("Keeping process-wide thread settings", model_id=key,
+                      applied_from=_threads_source)
+    _logger.debug("Applied runtime profile", model_id=key, **settings)
+    return True
+
+
+def _candidate_threads():
+    cpus = os.cpu_count() or 1
+    counts, n = [], 1
+    while n < cpus:
+        counts.append(n)
+        n *= 2
+    return counts + [cpus]
+
+
+def autotune(model, inputs, thread_counts=None, batch_sizes=(1, 4, 8, 16, 32, 64),
+             max_latency_ms=None, repeats=3):
+    """Sweep thread counts x batch sizes and return the best settings.
+
+    Picks the highest throughput; with max_latency_ms, only settings whose
+    per-batch latency stays within the bound are eligible (the fastest
+    setting wins if none is). Runs the uncached forward pass directly.
+    """
+    model.use_runtime_profile = False
+    model.load()
+    model._run_batch(inputs[:2], 2)
+
+    trials = []
+    for threads in thread_counts or _candidate_threads():
+        apply_threads(threads)
+        for bs in batch_sizes:
+            batch = (inputs * (bs // len(inputs) + 1))[:bs]
+            model._run_batch(batch, bs)  # warm this shape
+            times = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                model._run_batch(batch, bs)
+                times.append(time.perf_counter() - t0)
+            latency = statistics.median(times)
+            trials.append({
+                "num_threads": threads,
+                # cores not used for intra-op work can serve concurrent requests
+                "batch_size": bs,
+                "batch_latency_ms": round(latency * 1000, 3),
+                "throughput": round(bs / latency, 2),
+            })
+            _logger.info("autotune trial", model_id=model.model_id, **trials[-1])
+
+    eligible = trials
+    if max_latency_ms is not None:
+        eligible = [t for t in trials if t["batch_latency_ms"] <= max_latency_ms]
+        if not eligible:
+            eligible = [min(trials, key=lambda t: t["batch_latency_ms"])]
+    best = dict(max(eligible, key=lambda t: t["throughput"]))
+    best["objective"] = "throughput" if max_latency_ms is None else f"latency<={max_latency_ms}ms"
+    best["tuned_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    return best, trials
@@ -0,0 +1,166 @@
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+
+from utils.metrics import get_metrics
+
+
+def _worker_main(model, tasks, results, threads):
+    """Child process loop: run batches on the weights inherited from the parent."""
+    import torch
+
+    from utils.metrics import get_metrics
+
+    # each worker gets its own slice of the cores for intra-op parallelism
+    torch.set_num_threads(threads)
+    while True:
+        job = tasks.get()
+        if job is None:
+            return
+        job_id, inputs, batch_size = job
+        try:
+            out, error = model._run_batch(inputs, batch_size), None
+        except Exception as e:
+            out, error = None, f"{type(e).__name__}: {e}"
+        # stage timings recorded here would otherwise never reach the parent
+        results.put((job_id, out, error, get_metrics().drain()))
+
+
+class ForkedWorkerPool:
+    """Pre-forked processes that share one loaded model copy-on-write.
+
+    The parent loads the pipeline once and then forks; weight tensors are
+    only ever read, so their pages stay shared between all workers instead
+    of every process holding its own copy. Batches are spread over the
+    workers through a shared task queue, which sidesteps the GIL around
+    tokenization, decoding and postprocessing.
+
+    Each worker has its own task queue, so the parent knows which batches
+    a worker holds; if a worker dies (segfault, OOM kill) its batches are
+    retried once on the others, and the call fails only when a batch kills
+    a second worker or no worker is left.
+
+    Fork before running inference in the parent: forking after the
+    OpenMP/MKL thread pools have started can hang the children. Needs the
+    "fork" start method (Linux/macOS).
+    """
+
+    in_flight_per_worker = 2  # batches queued on a worker ahead of its current one
+    poll_s = 0.5
+
+    def __init__(self, model, workers=None, threads_per_worker=None):
+        cpus = os.cpu_count() or 1
+        self.workers = workers or cpus
+        self.threads_per_worker = threads_per_worker or max(1, cpus // self.workers)
+        self._model = model
+        try:
+            ctx = multiprocessing.get_context("fork")
+        except ValueError:
+            raise RuntimeError("ForkedWorkerPool needs the 'fork' start method")
+
+        model.load()  # once, in the parent; children inherit the weights
+        # tokenizers' own thread pool must be off before fork, not after, or
+        # the children inherit a pool whose threads no longer exist
+        os.environ["TOKENIZERS_PARALLELISM"] = "false"
+        self._results = ctx.Queue()
+        self._tasks = [ctx.Queue() for _ in range(self.workers)]
+        self._procs = [
+            ctx.Process(
+                target=_worker_main,
+                args=(model, tasks, self._results, self.threads_per_worker),
+                daemon=True,
+            )
+            for tasks in self._tasks
+        ]
+        for p in self._procs:
+            p.start()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def map_batches(self, inputs, batch_size=None):
+        """Run inputs across the workers; results come back in input order."""
+        inputs = list(inputs)
+        batch_size = batch_size or self._model.default_batch_size
+        # one caller at a time, so results on the shared queue belong to us
+        with self._lock:
+            todo = deque()
+            starts = {}
+            for start in range(0, len(inputs), batch_size):
+                job_id = self._next_id
+                self._next_id += 1
+                starts[job_id] = start
+                todo.append((job_id, inputs[start:start + batch_size]))
+
+            results = [None] * len(inputs)
+            errors = []
+            held = {w: {} for w, p in enumerate(self._procs) if p.is_alive()}
+            retried = set()
+            pending = set(starts)
+            while pending:
+                self._dispatch(todo, held, batch_size)
+                try:
+                    job_id, out, error, hists = self._results.get(timeout=self.poll_s)
+                except queue.Empty:
+                    job_id = None
+                if job_id is not None:
+                    get_metrics().merge(hists)
+                    for jobs in held.values():
+                        jobs.pop(job_id, None)
+                    # a result for a batch already retried elsewhere arrives twice
+                    if job_id in pending:
+                        pending.discard(job_id)
+                        if error is not None:
+                            errors.append(error)
+                        else:
+                            start = starts[job_id]
+                            results[start:start + len(out)] = out
+                self._reap(held, todo, retried, pending, errors)
+        if errors:
+            raise RuntimeError(f"{len(errors)} batch(es) failed in workers: {errors[0]}")
+        return results
+
+    def _dispatch(self, todo, held, batch_size):
+        # round-robin, so small calls spread over all workers
+        for _ in range(self.in_flight_per_worker):
+            for w, jobs in held.items():
+                if todo and len(jobs) < self.in_flight_per_worker:
+                    job_id, chunk = todo.popleft()
+                    jobs[job_id] = chunk
+                    self._tasks[w].put((job_id, chunk, batch_size))
+
+    def _reap(self, held, todo, retried, pending, errors):
+        """Requeue the batches of workers that died; give up on a batch that kills two."""
+        for w in [w for w in held if self._procs[w].exitcode is not None]:
+            code = self._procs[w].exitcode
+            for job_id, chunk in held.pop(w).items():
+                if job_id not in pending:
+                    continue
+                if job_id in retried:
+                    pending.discard(job_id)
+                    errors.append(f"worker died (exit code {code}) twice on one batch")
+                else:
+                    retried.add(job_id)
+                    todo.appendleft((job_id, chunk))
+        if pending and not held:
+            raise RuntimeError("all pool workers have died")
+
+    def process_batch(self, inputs, batch_size=None):
+        """Like model.process_batch(), with cache misses computed in the workers."""
+        return self._model._with_cache(list(inputs), lambda xs: self.map_batches(xs, batch_size))
+
+    def close(self):
+        for p, tasks in zip(self._procs, self._tasks):
+            if p.is_alive():
+                tasks.put(None)
+        for p in self._procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1 @@
+# Empty file to make server a package
\ No newline at end of file
@@ -0,0 +1,339 @@
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+
+from models.batching import MicroBatcher, QueueFullError
+from utils.metrics import get_metrics
+from utils.log import dropped_records, get_logger, request_context
+
+_logger = get_logger("SERVER")
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+}
+
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+ROUTES = ("/healthz", "/metrics", "/v1/text/classify", "/v1/image/classify")
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _unlink_when_settled(futures, paths):
+    """Delete temp files once no submitted request can still read them.
+
+    A request that was cancelled or timed out may already be running in the
+    batcher thread, so the files outlive the handler until it finishes.
+    """
+    def unlink():
+        for p in paths:
+            try:
+                os.unlink(p)
+            except FileNotFoundError:
+                pass
+
+    pending = [f for f in futures if not f.done()]
+    if not pending:
+        unlink()
+        return
+    lock = threading.Lock()
+    left = [len(pending)]
+
+    def settled(_):
+        with lock:
+            left[0] -= 1
+            last = left[0] == 0
+        if last:
+            unlink()
+
+    for f in pending:
+        f.add_done_callback(settled)
+
+
+class RouteStats:
+    """Request counters and a window of recent latencies for one route."""
+
+    def __init__(self, window=2048):
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self._latencies = deque(maxlen=window)
+
+    def observe(self, seconds, status):
+        self.requests += 1
+        if status == 429:
+            self.rejected += 1
+        elif status >= 400:
+            self.errors += 1
+        self._latencies.append(seconds)
+
+    def snapshot(self):
+        lat = sorted(self._latencies)
+
+        def pct(p):
+            return lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else None
+
+        return {
+            "requests": self.requests, "errors": self.errors, "rejected": self.rejected,
+            "p50_ms": pct(0.50), "p99_ms": pct(0.99),
+        }
+
+
+class InferenceServer:
+    """Minimal asyncio HTTP/1.1 server in front of BaseAIModel subclasses.
+
+    Routes:
+        POST /v1/text/classify   {"text": "..."} or {"texts": [...]}
+        POST /v1/image/classify  {"path": "..."}, {"paths": [...]} or {"image_b64": "..."}
+        GET  /healthz            model load status
+        GET  /metrics            per-route counters, latency percentiles, queue depths
+
+    Each request item goes through the model's MicroBatcher, so concurrent
+    requests are coalesced into one forward pass that runs off the event
+    loop. When a queue holds max_queue_size items the server answers 429.
+    """
+
+    def __init__(self, text_model=None, image_model=None, host="127.0.0.1", port=8080):
+        self.host = host
+        self.port = port
+        self._models = {}
+        self._batchers = {}
+        for task, model in (("text", text_model), ("image", image_model)):
+            if model is not None:
+                self._models[task] = model
+                # cached + batched: repeats are answered without a forward pass
+                self._batchers[task] = MicroBatcher(model, run_batch=model.process_batch)
+        self._stats = {}
+        self._started = time.time()
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_conn, self.host, self.port)
+        # port=0 picks a free port; report the real one
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for batcher in self._batchers.values():
+            batcher.close(wait=False)
+
+    async def warmup(self):
+        """Load every model in the default executor before taking traffic."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(None, m.warmup) for m in self._models.values()))
+
+    # -- connection handling ------------------------------------------------
+
+    async def _handle_conn(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                t0 = time.perf_counter()
+                with request_context(headers.get("x-request-id")) as rid:
+                    try:
+                        status, payload = await self._dispatch(method, path, body)
+                    except HttpError as e:
+                        status, payload = e.status, {"error": str(e)}
+                    except Exception as e:
+                        _logger.error(f"{method} {path} failed: {e}")
+                        status, payload = 500, {"error": str(e)}
+                    elapsed = time.perf_counter() - t0
+                    _logger.debug(f"{method} {path} {status}", ms=round(elapsed * 1000, 2))
+                # one bucket for every unknown path, so scanners can't grow the table
+                route = path if path in ROUTES else "unknown"
+                self._stats.setdefault(route, RouteStats()).observe(elapsed, status)
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HttpError as e:
+            self._write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HttpError(400, "malformed content-length")
+        if length < 0:
+            raise HttpError(400, "malformed content-length")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+
+    # -- routes ---------------------------------------------------------------
+
+    async def _dispatch(self, method, path, body):
+        if path == "/healthz":
+            return 200, self._health()
+        if path == "/metrics":
+            return 200, self._metrics()
+        if path in ("/v1/text/classify", "/v1/image/classify"):
+            if method != "POST":
+                raise HttpError(405, "use POST")
+            task = path.split("/")[2]
+            if task not in self._models:
+                raise HttpError(404, f"no {task} model loaded")
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                raise HttpError(400, "body must be JSON")
+            return 200, await self._classify(task, request)
+        raise HttpError(404, f"unknown path {path}")
+
+    async def _classify(self, task, request):
+        tmp_paths, futures = [], []
+        try:
+            items, single = self._items(task, request, tmp_paths)
+            batcher = self._batchers[task]
+            try:
+                for x in items:
+                    futures.append(batcher.submit(x))
+            except QueueFullError as e:
+                # don't leave the first half of a rejected request in the queue
+                for f in futures:
+                    f.cancel()
+                raise HttpError(429, f"server busy: {e}")
+            try:
+                results = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+            except OSError as e:
+                if task != "image":
+                    raise
+                raise HttpError(400, f"cannot read image: {e}")
+        finally:
+            if tmp_paths:
+                _unlink_when_settled(futures, tmp_paths)
+        return {"result": results[0]} if single else {"results": results}
+
+    @staticmethod
+    def _items(task, request, tmp_paths):
+        key, many = ("text", "texts") if task == "text" else ("path", "paths")
+        if not isinstance(request, dict):
+            raise HttpError(400, "body must be a JSON object")
+        if many in request:
+            items, single = request[many], False
+        elif key in request:
+            items, single = [request[key]], True
+        elif task == "image" and "image_b64" in request:
+            # the classifier works on files; spool the upload to a temp file
+            try:
+                data = base64.b64decode(request["image_b64"], validate=True)
+            except (TypeError, ValueError):
+                raise HttpError(400, "'image_b64' is not valid base64")
+            fd, path = tempfile.mkstemp(prefix="upload-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            tmp_paths.append(path)
+            items, single = [path], True
+        else:
+            raise HttpError(400, f"expected '{key}' or '{many}' in body")
+        if single and not isinstance(items[0], str):
+            raise HttpError(400, f"'{key}' must be a string")
+        if not isinstance(items, list) or not items or not all(isinstance(x, str) for x in items):
+            raise HttpError(400, f"'{many}' must be a non-empty list of strings")
+        if task == "image":
+            missing = [p for p in items if not os.path.isfile(p)]
+            if missing:
+                raise HttpError(400, f"no such image file: {missing[0]}")
+        return items, single
+
+    def _health(self):
+        return {
+            "status": "ok",
+            "uptime_s": time.time() - self._started,
+            "models": {t: {"model_id": m.model_id, "status": m.status} for t, m in self._models.items()},
+        }
+
+    def _metrics(self):
+        return {
+            "routes": {path: s.snapshot() for path, s in self._stats.items()},
+            "queues": {t: b.queue_depth for t, b in self._batchers.items()},
+            "stages": get_metrics().snapshot(),
+            "log_dropped": dropped_records(),
+        }
+
+
+def run_server(host="127.0.0.1", port=8080, tasks=("text", "image"),
+               max_batch_size=32, max_wait_ms=5, max_queue_size=256, warmup=True):
+    """Build the models, then serve until interrupted."""
+    from models.text_classifier import TextClassifier
+    from models.image_classifier import ImageClassifier
+
+    models = {}
+    for task, cls in (("text", TextClassifier), ("image", ImageClassifier)):
+        if task in tasks:
+            model = cls()
+            model.set_config(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                             max_queue_size=max_queue_size)
+            models[task] = model
+
+    async def main():
+        server = InferenceServer(models.get("text"), models.get("image"), host, port)
+        if warmup:
+            await server.warmup()
+        await server.start()
+        print(f"Serving on http://{server.host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
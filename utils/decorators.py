@@ -1,30 +1,49 @@
 import time
 from functools import wraps
+from utils.metrics import get_metrics
+from utils.log import DEBUG, get_logger, request_context
 
 def timeit(func):
     @wraps(func)
     def _w(*a, **k):
-        t0 = time.time()
-        out = func(*a, **k)
-        _w.last_runtime_s = time.time() - t0
-        return out
-    _w.last_runtime_s = None
+        t0 = time.perf_counter()
+        try:
+            return func(*a, **k)
+        finally:
+            # recorded per model and method, so concurrent calls never overwrite each other
+            owner = getattr(a[0], "model_id", None) if a else None
+            items = a[1] if len(a) > 1 else None
+            n = len(items) if isinstance(items, (list, tuple)) else 1
+            get_metrics().record(owner or func.__module__, func.__name__, time.perf_counter() - t0, n)
     return _w
 
 def log_call(logger_name="APP"):
     def deco(func):
+        logger = get_logger(logger_name)
+
         @wraps(func)
         def _w(*a, **k):
-            print(f"[{logger_name}] {func.__name__} called")
-            return func(*a, **k)
+            if not logger.enabled(DEBUG):
+                return func(*a, **k)
+            # everything logged inside this call shares one correlation ID
+            with request_context():
+                logger.debug(f"{func.__name__} called")
+                return func(*a, **k)
         return _w
     return deco
 
-def ensure_input(expected_types: tuple):
+def ensure_input(expected_types: tuple, batch: bool = False):
     def deco(func):
         @wraps(func)
         def _w(self, input_data, *a, **k):
-            if not isinstance(input_data, expected_types):
+            if batch:
+                # batch entry points take a list/tuple of expected_types
+                if not isinstance(input_data, (list, tuple)):
+                    raise TypeError(f"Expected a list of {expected_types}, got {type(input_data)}")
+                for i, item in enumerate(input_data):
+                    if not isinstance(item, expected_types):
+                        raise TypeError(f"Expected {expected_types} at index {i}, got {type(item)}")
+            elif not isinstance(input_data, expected_types):
                 raise TypeError(f"Expected {expected_types}, got {type(input_data)}")
             return func(self, input_data, *a, **k)
         return _w
@@ -0,0 +1,223 @@
+import contextvars
+import itertools
+import threading
+import time
+from collections import deque
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+FINISHED = (DONE, FAILED, CANCELLED, TIMED_OUT)
+
+_local = threading.local()
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by JobExecutor.submit() when the FIFO is at capacity."""
+    pass
+
+
+class JobCancelled(Exception):
+    """Raised by check_cancelled() to unwind a job that was cancelled or timed out."""
+    pass
+
+
+def current_job():
+    """The Job running on this worker thread (None elsewhere).
+
+    Long-running job functions can poll ``current_job().cancelled`` to stop early.
+    """
+    return getattr(_local, "job", None)
+
+
+def check_cancelled():
+    """Raise JobCancelled if the job running on this thread was cancelled or timed out.
+
+    A no-op outside job threads, so library code can call it between steps.
+    """
+    job = current_job()
+    if job is not None and job.cancelled:
+        raise JobCancelled(f"job {job.id} {job.status}")
+
+
+class Job:
+    def __init__(self, job_id, fn, args, kwargs, name, timeout):
+        self.id = job_id
+        self.name = name or getattr(fn, "__name__", "job")
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.timeout = timeout
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.executing = False  # a worker thread is inside fn (even after cancel/timeout)
+        self._fn, self._args, self._kwargs = fn, args, kwargs
+        # the submitter's context vars (e.g. the log request ID) carry over to the worker
+        self._context = contextvars.copy_context()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _finish(self, status, result=None, error=None):
+        # first outcome wins: a cancel/timeout beats a late result
+        with self._lock:
+            if self.finished:
+                return False
+            self.status, self.result, self.error = status, result, error
+            self.finished_at = time.monotonic()
+        self._done.set()
+        return True
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.name} {self.status}>"
+
+
+class JobExecutor:
+    """Fixed worker pool over a bounded FIFO of jobs with IDs.
+
+    - submit() raises JobQueueFull instead of growing without bound
+    - cancel() removes a queued job, or marks a running one cancelled so
+      its result is discarded (and current_job().cancelled turns true)
+    - a running job past its timeout is marked timed_out the same way
+    - Python threads cannot be killed, so a cancelled job keeps its worker
+      until fn returns; counts() reports it as "stopping" until then, and
+      jobs should poll check_cancelled() to return early
+    """
+
+    def __init__(self, workers=2, max_queue=32, default_timeout=None):
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self._queue = deque()
+        self._jobs = {}
+        self._executing = set()  # jobs occupying a worker, including forgotten ones
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+        threading.Thread(target=self._watchdog, name="job-watchdog", daemon=True).start()
+
+    def submit(self, fn, *args, name=None, timeout=None, **kwargs) -> Job:
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("JobExecutor is shut down")
+            if len(self._queue) >= self.max_queue:
+                raise JobQueueFull(f"{len(self._queue)} jobs already queued")
+            job = Job(next(self._ids), fn, args, kwargs, name,
+                      timeout if timeout is not None else self.default_timeout)
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._cond.notify()
+            return job
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self, include_finished=False):
+        with self._cond:
+            return [j for j in self._jobs.values() if include_finished or not j.finished]
+
+    def counts(self):
+        """{"queued": n, "running": n, "stopping": n} for status displays.
+
+        running counts every busy worker; stopping is the part of it whose
+        job was cancelled or timed out but has not returned yet.
+        """
+        with self._cond:
+            stopping = sum(1 for j in self._executing if j.finished)
+            return {"queued": len(self._queue), "running": len(self._executing),
+                    "stopping": stopping}
+
+    def cancel(self, job_id) -> bool:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job._cancel.set()
+            if job.status == QUEUED:
+                self._queue.remove(job)
+            return job._finish(CANCELLED)
+
+    def cancel_all(self) -> int:
+        with self._cond:
+            ids = [j.id for j in self._jobs.values() if not j.finished]
+        return sum(self.cancel(i) for i in ids)
+
+    def forget(self, job_id):
+        """Drop a finished job from the table once its result has been consumed."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished:
+                del self._jobs[job_id]
+
+    def shutdown(self, cancel_pending=True):
+        with self._cond:
+            self._shutdown = True
+            if cancel_pending:
+                for job in self._queue:
+                    job._cancel.set()
+                    job._finish(CANCELLED)
+                self._queue.clear()
+            self._cond.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._shutdown:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                job = self._queue.popleft()
+                job.status = RUNNING
+                job.started_at = time.monotonic()
+                job.executing = True
+                self._executing.add(job)
+
+            _local.job = job
+            try:
+                result = job._context.run(job._fn, *job._args, **job._kwargs)
+            except JobCancelled:
+                job._finish(CANCELLED)  # no-op when the cancel/timeout already finished it
+            except Exception as e:
+                job._finish(FAILED, error=e)
+            else:
+                job._finish(DONE, result=result)
+            finally:
+                _local.job = None
+                with self._cond:
+                    job.executing = False
+                    self._executing.discard(job)
+
+    def _watchdog(self, interval=0.1):
+        while not self._shutdown:
+            now = time.monotonic()
+            with self._cond:
+                overdue = [
+                    j for j in self._jobs.values()
+                    if j.status == RUNNING and j.timeout is not None
+                    and now - j.started_at > j.timeout
+                ]
+            for job in overdue:
+                job._cancel.set()
+                job._finish(TIMED_OUT, error=TimeoutError(f"job {job.id} exceeded {job.timeout}s"))
+            time.sleep(interval)
@@ -0,0 +1,194 @@
+import atexit
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+_LEVELS = {v: k for k, v in LEVEL_NAMES.items()}
+
+_request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id=None):
+    """Tag every log record in this block (and this thread/task) with one correlation ID.
+
+    An enclosing context's ID is reused unless request_id is given explicitly.
+    """
+    rid = request_id or _request_id.get() or uuid.uuid4().hex[:12]
+    token = _request_id.set(rid)
+    try:
+        yield rid
+    finally:
+        _request_id.reset(token)
+
+
+class AsyncHandler:
+    """Formats and writes records on a background thread.
+
+    Loggers only append to a bounded ring buffer, so the caller never waits
+    on stdout; if the writer falls behind, the oldest records are dropped
+    and counted instead of blocking inference. The count is exposed as
+    `dropped` and the writer reports each gap in the output. The writer
+    thread starts with the first record, so importing costs no thread.
+    """
+
+    def __init__(self, stream=None, json_format=False, capacity=10000):
+        self.stream = stream or sys.stdout
+        self.json_format = json_format
+        self.dropped = 0
+        self._reported = 0  # drops already announced in the output
+        self._buf = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def emit(self, record):
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+            if len(self._buf) == self._buf.maxlen:
+                self.dropped += 1
+            self._buf.append(record)
+            self._cond.notify()
+
+    def format(self, record):
+        ts, level, name, msg, fields, rid = record
+        if self.json_format:
+            out = {"ts": ts, "level": LEVEL_NAMES[level], "logger": name, "msg": msg}
+            if rid:
+                out["request_id"] = rid
+            out.update(fields)
+            return json.dumps(out, default=str)
+        line = f"[{name}] {msg}"
+        if rid:
+            line += f" (req={rid})"
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._buf and not self._closed:
+                    self._cond.wait()
+                batch = list(self._buf)
+                self._buf.clear()
+                closed = self._closed
+                lost, self._reported = self.dropped - self._reported, self.dropped
+            if lost:
+                batch.insert(0, (time.time(), WARNING, "LOG",
+                                 f"{lost} log records dropped; the writer fell behind", {}, None))
+            if batch:
+                self.stream.write("".join(self.format(r) + "\n" for r in batch))
+                self.stream.flush()
+            if closed and not batch:
+                return
+
+    def _after_fork_in_child(self):
+        # the writer thread does not survive fork and the condition's lock may
+        # have been held by it; buffered records are the parent's to write
+        self._cond = threading.Condition()
+        self._buf.clear()
+        self._closed = False
+        self._thread = None
+
+    def close(self, timeout=2.0):
+        """Flush what is buffered and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+class Logger:
+    def __init__(self, name):
+        self.name = name
+
+    def enabled(self, level):
+        return level >= _config["level"]
+
+    def log(self, level, msg, **fields):
+        # the level check is the only cost of a disabled call
+        if level < _config["level"]:
+            return
+        _config["handler"].emit((time.time(), level, self.name, msg, fields, _request_id.get()))
+
+    def debug(self, msg, **fields):
+        self.log(DEBUG, msg, **fields)
+
+    def info(self, msg, **fields):
+        self.log(INFO, msg, **fields)
+
+    def warning(self, msg, **fields):
+        self.log(WARNING, msg, **fields)
+
+    def error(self, msg, **fields):
+        self.log(ERROR, msg, **fields)
+
+
+_config = {"level": INFO, "handler": None}
+_loggers = {}
+_lock = threading.Lock()
+
+
+def configure(level=None, json_format=None, stream=None, capacity=10000):
+    """(Re)configure logging. Defaults come from LOG_LEVEL and LOG_FORMAT=json."""
+    if level is None:
+        level = os.environ.get("LOG_LEVEL", "INFO")
+    if json_format is None:
+        json_format = os.environ.get("LOG_FORMAT", "").lower() == "json"
+    with _lock:
+        old = _config["handler"]
+        _config["handler"] = AsyncHandler(stream, json_format, capacity)
+        _config["level"] = _LEVELS[level.upper()] if isinstance(level, str) else level
+    if old is not None:
+        old.close()
+
+
+def get_logger(name) -> Logger:
+    with _lock:
+        logger = _loggers.get(name)
+        if logger is None:
+            logger = _loggers[name] = Logger(name)
+        return logger
+
+
+def dropped_records() -> int:
+    """Records the current handler dropped because its buffer was full."""
+    handler = _config["handler"]
+    return handler.dropped if handler is not None else 0
+
+
+def shutdown():
+    handler = _config["handler"]
+    if handler is not None:
+        handler.close()
+
+
+def _after_fork_in_child():
+    global _lock
+    _lock = threading.Lock()
+    handler = _config["handler"]
+    if handler is not None:
+        handler._after_fork_in_child()
+
+
+configure()
+atexit.register(shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,181 @@
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# latency buckets grow by 20% from 10us to ~20 min: ~115 buckets, constant memory
+_MIN_S = 1e-5
+_GROWTH = 1.2
+_N_BUCKETS = 115
+
+
+def _bucket(seconds):
+    if seconds <= _MIN_S:
+        return 0
+    return min(_N_BUCKETS - 1, int(math.log(seconds / _MIN_S, _GROWTH)) + 1)
+
+
+def _upper_bound(index):
+    return _MIN_S * _GROWTH ** index
+
+
+class Histogram:
+    """Fixed-memory latency histogram with percentile estimates (within ~20%)."""
+
+    def __init__(self):
+        self.counts = [0] * _N_BUCKETS
+        self.count = 0
+        self.items = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.first_t = None
+        self.last_t = None
+
+    def observe(self, seconds, items=1):
+        self.counts[_bucket(seconds)] += 1
+        self.count += 1
+        self.items += items
+        self.total_s += seconds
+        self.max_s = max(self.max_s, seconds)
+        now = time.monotonic()
+        if self.first_t is None:
+            self.first_t = now - seconds
+        self.last_t = now
+
+    def merge(self, other):
+        """Fold another histogram (e.g. from a worker process) into this one."""
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.items += other.items
+        self.total_s += other.total_s
+        self.max_s = max(self.max_s, other.max_s)
+        if other.first_t is not None:
+            # monotonic clocks of other processes share the system boot epoch on Linux/macOS
+            self.first_t = other.first_t if self.first_t is None else min(self.first_t, other.first_t)
+            self.last_t = other.last_t if self.last_t is None else max(self.last_t, other.last_t)
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(_upper_bound(i), self.max_s)
+        return self.max_s
+
+    def snapshot(self):
+        wall = (self.last_t - self.first_t) if self.count else 0.0
+
+        def ms(v):
+            return None if v is None else v * 1000
+
+        return {
+            "count": self.count,
+            "items": self.items,
+            "mean_ms": ms(self.total_s / self.count) if self.count else None,
+            "p50_ms": ms(self.percentile(0.50)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "max_ms": ms(self.max_s) if self.count else None,
+            # items per second of time spent in this stage / per second of wall clock
+            "items_per_busy_s": self.items / self.total_s if self.total_s else None,
+            "items_per_wall_s": self.items / wall if wall > 0 else None,
+        }
+
+
+class MetricsRegistry:
+    """Per-model, per-stage latency histograms (load, tokenize/decode, forward, ...)."""
+
+    def __init__(self):
+        self._hists = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_id, stage, seconds, items=1):
+        with self._lock:
+            hist = self._hists.get((model_id, stage))
+            if hist is None:
+                hist = self._hists[(model_id, stage)] = Histogram()
+            hist.observe(seconds, items)
+
+    @contextmanager
+    def time(self, model_id, stage, items=1):
+        """Time the body with the monotonic clock and record it."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(model_id, stage, time.perf_counter() - t0, items)
+
+    def snapshot(self, model_id=None):
+        """{model_id: {stage: stats}} for every model (or just model_id)."""
+        with self._lock:
+            out = {}
+            for (mid, stage), hist in sorted(self._hists.items()):
+                if model_id is None or mid == model_id:
+                    out.setdefault(mid, {})[stage] = hist.snapshot()
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._hists.clear()
+
+    def drain(self):
+        """Take every histogram recorded so far, leaving the registry empty."""
+        with self._lock:
+            hists, self._hists = self._hists, {}
+            return hists
+
+    def merge(self, hists):
+        """Add histograms returned by drain() in another process."""
+        with self._lock:
+            for key, other in hists.items():
+                hist = self._hists.get(key)
+                if hist is None:
+                    hist = self._hists[key] = Histogram()
+                hist.merge(other)
+
+    def _after_fork_in_child(self):
+        # the parent's lock may have been held mid-record at fork time, and its
+        # samples belong to the parent; a forked worker starts empty
+        self._lock = threading.Lock()
+        self._hists = {}
+
+
+_metrics = MetricsRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_metrics._after_fork_in_child)
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide metrics registry."""
+    return _metrics
+
+
+def instrument_pipeline(pipe, model_id, preprocess_stage="preprocess"):
+    """Wrap a transformers pipeline's stages so each records into get_metrics().
+
+    preprocess runs per input, _forward per batch and postprocess per input,
+    so the histograms show where a call's time actually goes.
+    """
+    if getattr(pipe, "_instrumented", False):
+        return pipe
+
+    def wrap(fn, stage, batched=False):
+        def _w(inputs, *a, **k):
+            items = 1
+            if batched:
+                first = next(iter(inputs.values()), None) if isinstance(inputs, dict) else None
+                items = len(first) if hasattr(first, "__len__") else 1
+            with _metrics.time(model_id, stage, items):
+                return fn(inputs, *a, **k)
+        return _w
+
+    pipe.preprocess = wrap(pipe.preprocess, preprocess_stage)
+    pipe._forward = wrap(pipe._forward, "forward", batched=True)
+    pipe.postprocess = wrap(pipe.postprocess, "postprocess")
+    pipe._instrumented = True
+    return pipe
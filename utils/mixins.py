@@ -1,6 +1,9 @@
+from utils.log import DEBUG, get_logger
+
 class LogMixin:
-    def log(self, msg: str):
-        print(f"[LOG] {msg}")
+    def log(self, msg: str, level: int = DEBUG, **fields):
+        # per-call messages default to DEBUG, so they cost one comparison unless enabled
+        get_logger("LOG").log(level, msg, **fields)
 
 class ConfigMixin:
     def set_config(self, **cfg):